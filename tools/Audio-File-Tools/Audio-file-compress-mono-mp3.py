@@ -1,68 +1,385 @@
 import os
+import re
+import sys
+import json
+import argparse
+import tempfile
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
-def compress_audio(input_file, output_file):
-    """
-    Convert any audio file to mono MP3, compressed to 10MB or less.
+# Probe results from earlier runs, so files are only probed again when they change
+PROBE_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'audio-probe-cache.json')
 
-    The function:
-    - Accepts any audio file format supported by ffmpeg.
-    - Converts audio to mono.
-    - Calculates maximum bitrate based on input duration to target ≤10MB output.
-    - Caps bitrate to a minimum of 32 kbps to avoid unusable quality.
-    - Saves output as MP3 format.
+# Bitrates an MPEG-1 Layer III (MP3) stream can use, in kbps. libmp3lame rounds other
+# values to the nearest of these, which may be higher, so only these are requested.
+MP3_BITRATES = [32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320]
 
-    Args:
-    input_file (str): Path to the input audio file.
-    output_file (str): Path to save the compressed MP3 file.
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.m4a', '.aac', '.ogg', '.oga', '.opus', '.wma', '.aiff', '.aif',
+                    '.alac', '.amr', '.mp2', '.mp3', '.webm')
+
+# Read once at startup: temp files are created owner-only, and finished MP3s get the usual permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Written into every MP3 this script creates (an ID3 TXXX frame), so later runs can tell
+# their own outputs from the user's files: only tagged files are ever overwritten or skipped
+TOOL_TAG = 'compressed_by'
+TOOL_NAME = 'Audio-file-compress-mono-mp3'
+
+SIZE_UNITS = {'': 1, 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+def parse_size(text):
+    """Turn '10MB', '9.5 MB' or '800KB' into bytes (1 MB = 1024 * 1024 bytes)."""
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMG]?B?)\s*', text.upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r} (use e.g. 10MB, 800KB)")
+    unit = match.group(2)
+    unit = unit + 'B' if unit in ('K', 'M', 'G') else unit
+    return int(float(match.group(1)) * SIZE_UNITS[unit])
+
+def format_size(size_bytes):
+    return f"{size_bytes / (1024 * 1024):.2f}MB"
+
+class ProbeIndex:
     """
-    # Check if the input file exists
-    if not os.path.exists(input_file):
-        print("Input file not found.")
-        return
+    Probe results (duration, and whether this script created the file) of audio
+    files, cached in a JSON file keyed by absolute path. An entry is reused only
+    while the file's size and modification time match.
+    """
+
+    def __init__(self, cache_file=PROBE_CACHE_FILE):
+        self.cache_file = cache_file
+        self.entries = {}
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                print(f"Ignoring unreadable probe cache '{cache_file}'")
 
-    # Get duration of input file in seconds using ffprobe
+    def _lookup(self, path):
+        stat = os.stat(path)
+        entry = self.entries.get(os.path.abspath(path))
+        if (entry and 'tool_output' in entry
+                and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime):
+            return {'duration': entry['duration'], 'tool_output': entry['tool_output']}
+        return None
+
+    def probe_all(self, paths, jobs=None):
+        """
+        Return {path: {'duration': seconds, 'tool_output': bool} or None}. Only
+        files missing from the cache (or changed since) are passed to ffprobe, all
+        in one parallel batch, and the cache file is written once at the end.
+        """
+        probes = {path: self._lookup(path) for path in paths}
+        missing = [path for path, probe in probes.items() if probe is None]
+        if missing:
+            print(f"Probing {len(missing)} file(s); {len(probes) - len(missing)} found in the probe cache.")
+            with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+                for path, probe in zip(missing, pool.map(probe_file, missing)):
+                    probes[path] = probe
+                    if probe is not None:
+                        stat = os.stat(path)
+                        self.entries[os.path.abspath(path)] = dict(probe, size=stat.st_size, mtime=stat.st_mtime)
+            self.save()
+        return probes
+
+    def save(self):
+        if not self.cache_file:
+            return
+        tmp_path = self.cache_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(tmp_path, self.cache_file)
+
+def probe_file(input_file):
+    """
+    Get duration of input file in seconds and its tags using ffprobe. Returns
+    {'duration': seconds, 'tool_output': bool}, or None if it can't be read.
+    """
     try:
         result = subprocess.run(
-            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-             '-of', 'default=noprint_wrappers=1:nokey=1', input_file],
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration:format_tags',
+             '-of', 'json', input_file],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
             check=True
         )
-        duration = float(result.stdout.strip())
-    except Exception as e:
-        print("Failed to get audio duration:", e)
-        return
-
-    # Calculate target bitrate in kbps
-    target_size_bits = 10 * 8 * 1024 * 1024  # 10MB in bits
-    bitrate_kbps = int(target_size_bits / duration / 1000)
-
-    # Enforce minimum bitrate of 32 kbps
-    min_bitrate = 32
-    if bitrate_kbps < min_bitrate:
-        print(f"Warning: audio too long to fit 10MB at reasonable quality. Using minimum bitrate {min_bitrate} kbps.")
-        bitrate_kbps = min_bitrate
-    else:
-        print(f"Calculated bitrate: {bitrate_kbps} kbps")
+        info = json.loads(result.stdout)['format']
+        tags = {key.lower(): value for key, value in info.get('tags', {}).items()}
+        return {'duration': float(info['duration']), 'tool_output': tags.get(TOOL_TAG) == TOOL_NAME}
+    except (subprocess.CalledProcessError, ValueError, KeyError, OSError) as e:
+        print(f"Failed to get audio duration of '{input_file}':", e)
+        return None
+
+def probe_duration(input_file):
+    """Get duration of input file in seconds using ffprobe (None if it can't be read)."""
+    probe = probe_file(input_file)
+    return probe['duration'] if probe else None
+
+def choose_bitrate(duration, target_bytes, min_kbps=32, max_kbps=320):
+    """
+    The highest standard MP3 bitrate whose output fits in target_bytes,
+    kept between min_kbps and max_kbps.
+    """
+    budget_kbps = target_bytes * 8 / duration / 1000
+    allowed = [rate for rate in MP3_BITRATES if min_kbps <= rate <= max_kbps] or [min_kbps]
+    fitting = [rate for rate in allowed if rate <= budget_kbps]
+    return fitting[-1] if fitting else allowed[0]
 
-    # Compress audio using ffmpeg: mono, mp3 codec, target bitrate
+def encode_mono_mp3(input_file, output_file, bitrate_kbps):
+    """Compress audio using ffmpeg: mono, mp3 codec, target bitrate. Returns True on success."""
     try:
         subprocess.run([
-            'ffmpeg', '-i', input_file,
+            'ffmpeg', '-y', '-nostdin', '-hide_banner', '-loglevel', 'error',
+            '-i', input_file,
+            '-vn',
             '-ac', '1',
             '-codec:a', 'libmp3lame',
             '-b:a', f'{bitrate_kbps}k',
+            '-metadata', f'{TOOL_TAG}={TOOL_NAME}',
+            '-f', 'mp3',
             output_file
         ], check=True)
-        print("Compression successful!")
+        return True
     except subprocess.CalledProcessError as e:
-        print("Compression failed:", e)
+        print(f"Compression of '{input_file}' failed:", e)
+        return False
+
+def compress_audio(input_file, output_file, target_bytes=10 * 1024 * 1024, min_kbps=32, max_kbps=320,
+                   duration=None):
+    """
+    Convert any audio file to mono MP3, compressed to target_bytes (10MB by default) or less.
+
+    The function:
+    - Accepts any audio file format supported by ffmpeg.
+    - Converts audio to mono.
+    - Calculates maximum bitrate based on input duration to fit the target size.
+    - Keeps the bitrate between min_kbps and max_kbps.
+    - Checks the size of the result and re-encodes at a lower bitrate only if it overshoots.
+    - Saves output as MP3 format.
+
+    Args:
+    input_file (str): Path to the input audio file.
+    output_file (str): Path to save the compressed MP3 file.
+    duration (float): Length in seconds, if already known (probed with ffprobe otherwise).
+
+    Returns a dict with the status ('ok', 'over budget' or 'failed'), bitrate and size.
+    """
+    result = {'input': input_file, 'output': output_file, 'status': 'failed'}
+
+    # Check if the input file exists
+    if not os.path.exists(input_file):
+        print("Input file not found.")
+        return result
+
+    if duration is None:
+        duration = probe_duration(input_file)
+    if not duration:
+        return result
+
+    bitrate_kbps = choose_bitrate(duration, target_bytes, min_kbps, max_kbps)
+    if bitrate_kbps * 1000 * duration / 8 > target_bytes:
+        print(f"Warning: '{input_file}' is too long to fit {format_size(target_bytes)} at reasonable quality. "
+              f"Using minimum bitrate {bitrate_kbps} kbps.")
+
+    # Encode to a unique temporary file next to the output and move it into place when done
+    fd, temp_file = tempfile.mkstemp(suffix='.mp3.part', dir=os.path.dirname(os.path.abspath(output_file)))
+    os.close(fd)
+    try:
+        while True:
+            if not encode_mono_mp3(input_file, temp_file, bitrate_kbps):
+                return result
+            size = os.path.getsize(temp_file)
+            lower = [rate for rate in MP3_BITRATES if min_kbps <= rate < bitrate_kbps]
+            if size <= target_bytes or not lower:
+                break
+            # Overshot (tags, frame padding): step down to the bitrate the actual size says should fit
+            fitting = [rate for rate in lower if rate <= bitrate_kbps * target_bytes / size]
+            next_kbps = fitting[-1] if fitting else lower[0]
+            print(f"'{output_file}' came out at {format_size(size)} at {bitrate_kbps} kbps; "
+                  f"re-encoding at {next_kbps} kbps.")
+            bitrate_kbps = next_kbps
+        os.chmod(temp_file, 0o666 & ~_UMASK)
+        os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    result.update(bitrate_kbps=bitrate_kbps, size=size,
+                  status='ok' if size <= target_bytes else 'over budget')
+    return result
+
+def _normalize(path):
+    return os.path.normcase(os.path.abspath(path))
+
+def find_audio_files(paths, exclude_dir=None):
+    """
+    Collect (audio file, root folder) pairs from the given files and folders
+    (folders are searched recursively). Files inside exclude_dir are left out.
+    """
+    audio_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, subfolders, filenames in os.walk(path):
+                if exclude_dir and _normalize(folder) == _normalize(exclude_dir):
+                    subfolders[:] = []
+                    continue
+                subfolders.sort()
+                audio_files.extend((os.path.join(folder, name), path) for name in sorted(filenames)
+                                   if name.lower().endswith(AUDIO_EXTENSIONS))
+        elif os.path.isfile(path):
+            audio_files.append((path, os.path.dirname(path)))
+        else:
+            print(f"Skipping missing path: {path}")
+    return audio_files
+
+def output_path_for(input_file, root, output_dir=None):
+    """
+    '<name>.mp3' next to the input, or at the same relative path under output_dir.
+    '<name>-mono.mp3' if that would be the input itself.
+    """
+    base, _ = os.path.splitext(input_file)
+    if output_dir:
+        base = os.path.join(output_dir, os.path.relpath(base, root))
+    output_file = base + '.mp3'
+    if _normalize(output_file) == _normalize(input_file):
+        output_file = base + '-mono.mp3'
+    return output_file
+
+def plan_outputs(outputs, probes):
+    """
+    Decide which of the {input: output path} pairs to compress, using the probe
+    results of the inputs and of any outputs that already exist.
+    Returns (jobs, rejected results).
+
+    - Inputs created by this script (an earlier run's output) are skipped rather
+      than compressed again.
+    - Inputs that would write the same output are rejected instead of overwriting each other.
+    - An existing output is only replaced if this script created it; anything else
+      is the user's file, so the input is rejected and the file is left alone.
+    """
+    jobs = []
+    rejected = []
+
+    def reject(input_file, output_file, reason):
+        print(f"FAILED {input_file}: {reason}")
+        rejected.append({'input': input_file, 'output': output_file, 'status': 'failed', 'error': reason})
+
+    targets = {}
+    for input_file, output_file in outputs.items():
+        probe = probes.get(input_file)
+        if probe is None:
+            reject(input_file, output_file, "could not read its duration")
+        elif probe['tool_output']:
+            print(f"Skipping '{input_file}': it was created by this script")
+        else:
+            targets.setdefault(_normalize(output_file), []).append((input_file, output_file))
+
+    for sources in targets.values():
+        if len(sources) > 1:
+            names = ', '.join(input_file for input_file, _ in sources)
+            for input_file, output_file in sources:
+                reject(input_file, output_file, f"several inputs would write '{output_file}' ({names})")
+            continue
+        input_file, output_file = sources[0]
+        existing = probes.get(output_file)
+        if os.path.exists(output_file) and not (existing and existing['tool_output']):
+            reject(input_file, output_file, f"'{output_file}' already exists and was not created by this script")
+            continue
+        jobs.append((input_file, output_file))
+    return jobs, rejected
+
+def compress_batch(audio_files, output_dir=None, target_bytes=10 * 1024 * 1024, min_kbps=32, max_kbps=320,
+                   jobs=None, probe_cache=PROBE_CACHE_FILE):
+    """
+    Probe every input in one batch (reusing the probe cache), then compress them
+    on `jobs` parallel ffmpeg processes. audio_files holds (path, root folder)
+    pairs from find_audio_files. Returns the per-file results.
+    """
+    outputs = {input_file: output_path_for(input_file, root, output_dir) for input_file, root in audio_files}
+    # One probe pass covers the inputs and any outputs already on disk (to see who created them)
+    existing_outputs = [output_file for output_file in outputs.values() if os.path.exists(output_file)]
+    probe_paths = list(dict.fromkeys(list(outputs) + existing_outputs))
+    probes = ProbeIndex(probe_cache).probe_all(probe_paths, jobs=jobs)
+    planned, results = plan_outputs(outputs, probes)
+    durations = {input_file: probes[input_file]['duration'] for input_file, _ in planned}
+
+    def compress_one(job):
+        input_file, output_file = job
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        result = compress_audio(input_file, output_file, target_bytes,
+                                min_kbps, max_kbps, duration=durations[input_file])
+        if result['status'] == 'failed':
+            print(f"FAILED {input_file}")
+        else:
+            print(f"{result['status'].upper()}: {result['output']} "
+                  f"({format_size(result['size'])} at {result['bitrate_kbps']} kbps)")
+        return result
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        results += list(pool.map(compress_one, planned))
+
+    counts = {status: sum(1 for result in results if result['status'] == status)
+              for status in ('ok', 'over budget', 'failed')}
+    print(f"\nDone: {counts['ok']} within {format_size(target_bytes)}, "
+          f"{counts['over budget']} over budget, {counts['failed']} failed.")
+    return results
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compress audio files to mono MP3 under a target size.")
+    parser.add_argument('inputs', nargs='*', help="Audio files or folders (prompted for one file if omitted)")
+    parser.add_argument('--output', default=None, help="Output file (single input only)")
+    parser.add_argument('--output-dir', default=None,
+                        help="Folder for the compressed files (default: next to each input)")
+    parser.add_argument('--target-size', type=parse_size, default=parse_size('10MB'),
+                        help="Largest allowed output size, e.g. 25MB or 800KB (default: 10MB)")
+    parser.add_argument('--min-bitrate', type=int, default=32,
+                        help="Never go below this bitrate in kbps, even if the file overshoots (default: 32)")
+    parser.add_argument('--max-bitrate', type=int, default=320,
+                        help="Never go above this bitrate in kbps, even if the size allows it (default: 320)")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="Files probed and compressed at once (default: one per CPU core)")
+    parser.add_argument('--probe-cache', default=PROBE_CACHE_FILE,
+                        help="Probe cache file; pass an empty string to disable it")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.min_bitrate > args.max_bitrate:
+        print("--min-bitrate can't be higher than --max-bitrate.")
+        sys.exit(2)
+
+    inputs = args.inputs or [input("Enter the path to your input audio file: ").strip()]
+    # Don't pick up the outputs of an earlier run when they are written inside an input folder
+    input_files = find_audio_files(inputs, exclude_dir=args.output_dir)
+    if not input_files:
+        print("No audio files found.")
+        sys.exit(1)
+
+    if args.output:
+        if len(input_files) > 1:
+            print("--output only works with a single input file; use --output-dir instead.")
+            sys.exit(2)
+        input_file = input_files[0][0]
+        probe = ProbeIndex(args.probe_cache or None).probe_all([input_file])[input_file]
+        if probe is None:
+            sys.exit(1)
+        result = compress_audio(input_file, args.output, args.target_size, args.min_bitrate,
+                                args.max_bitrate, duration=probe['duration'])
+        results = [result]
+        if result['status'] == 'ok':
+            print(f"Compression successful! {format_size(result['size'])} at {result['bitrate_kbps']} kbps")
+        elif result['status'] == 'over budget':
+            print(f"Compressed, but still over {format_size(args.target_size)}: "
+                  f"{format_size(result['size'])} at the minimum {result['bitrate_kbps']} kbps")
+    else:
+        results = compress_batch(input_files, args.output_dir, args.target_size, args.min_bitrate,
+                                 args.max_bitrate, jobs=args.jobs, probe_cache=args.probe_cache or None)
 
-# Example usage:
-input_file = r"C:\Users\Tim\Downloads\Audio from Adele.oga"  # Replace with the path to your input audio file
-output_file = r"C:\Users\Tim\Downloads\Audio from Adele.mp3"  # Replace with the desired path for the compressed audio file
+    if any(result['status'] != 'ok' for result in results):
+        sys.exit(1)
 
-compress_audio(input_file, output_file)
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,24 @@
 import os
+import sys
+import json
+import time
+import argparse
+import tempfile
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# File types picked up in batch mode
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.m4a', '.aac', '.ogg', '.oga', '.opus', '.wma', '.aiff', '.aif',
+                    '.alac', '.amr', '.mp2', '.mp3', '.webm')
+
+# Read once at startup: temp files are created owner-only, and finished MP3s get the usual permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 
 def convert_audio_to_mp3(input_file, output_file):
     """
     Convert an audio file to MP3 format using ffmpeg.
-    
+
     Args:
         input_file (str): Path to the input audio file.
         output_file (str): Path to save the output MP3 file.
@@ -19,7 +33,138 @@ def convert_audio_to_mp3(input_file, output_file):
     except subprocess.CalledProcessError as e:
         print("Conversion failed:", e)
 
-def main():
+def transcode_file(input_file, output_file):
+    """
+    Batch worker: convert one file quietly and return a result record.
+
+    ffmpeg writes to a uniquely named temporary file in the output folder first,
+    so a failed or interrupted run never leaves an MP3 that looks up to date and
+    concurrent runs never write the same file.
+    """
+    started = time.perf_counter()
+    result = {'input': input_file, 'output': output_file}
+    partial_file = None
+    try:
+        fd, partial_file = tempfile.mkstemp(suffix='.mp3.part', dir=os.path.dirname(os.path.abspath(output_file)))
+        os.close(fd)
+        completed = subprocess.run(
+            ['ffmpeg', '-y', '-nostdin', '-hide_banner', '-loglevel', 'error',
+             '-i', input_file, '-vn', '-acodec', 'libmp3lame', '-f', 'mp3', partial_file],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        result['returncode'] = completed.returncode
+        if completed.returncode == 0:
+            os.chmod(partial_file, 0o666 & ~_UMASK)
+            os.replace(partial_file, output_file)
+            result['status'] = 'converted'
+        else:
+            result['status'] = 'failed'
+            result['error'] = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else ''
+    except OSError as e:
+        result.update(status='failed', returncode=None, error=str(e))
+    finally:
+        if partial_file and os.path.exists(partial_file):
+            os.remove(partial_file)
+    result['seconds'] = round(time.perf_counter() - started, 2)
+    return result
+
+def _normalize(path):
+    return os.path.normcase(os.path.abspath(path))
+
+def find_audio_files(paths, exclude_dir=None):
+    """
+    Collect (audio file, root folder) pairs from the given files and folders
+    (folders are searched recursively). Files inside exclude_dir are left out.
+    """
+    audio_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, subfolders, filenames in os.walk(path):
+                if exclude_dir and _normalize(folder) == _normalize(exclude_dir):
+                    subfolders[:] = []
+                    continue
+                subfolders.sort()
+                audio_files.extend((os.path.join(folder, name), path) for name in sorted(filenames)
+                                   if name.lower().endswith(AUDIO_EXTENSIONS))
+        elif os.path.isfile(path):
+            audio_files.append((path, os.path.dirname(path)))
+        else:
+            print(f"Skipping missing path: {path}")
+    return audio_files
+
+def output_path_for(input_file, root, output_dir=None):
+    """The MP3 next to the input, or at the same relative path under output_dir."""
+    base, _ = os.path.splitext(input_file)
+    if output_dir:
+        base = os.path.join(output_dir, os.path.relpath(base, root))
+    return base + ".mp3"
+
+def is_up_to_date(input_file, output_file):
+    """An output counts as done if it exists and is at least as new as its input."""
+    try:
+        return os.path.getmtime(output_file) >= os.path.getmtime(input_file)
+    except OSError:
+        return False
+
+def batch_convert(paths, jobs=None, output_dir=None, force=False):
+    """
+    Convert every audio file under the given paths, running `jobs` ffmpeg
+    processes at once (default: one per CPU core, since each MP3 encode uses one).
+    Returns a list of per-file result records.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    results = []
+    todo = []
+
+    # Inputs like 'x.wav' and 'x.flac' would both write 'x.mp3'; convert neither rather than pick one
+    targets = {}
+    # Don't pick up the outputs of an earlier run when they are written inside an input folder
+    for input_file, root in find_audio_files(paths, exclude_dir=output_dir):
+        output_file = output_path_for(input_file, root, output_dir)
+        if os.path.abspath(output_file) == os.path.abspath(input_file):
+            continue  # Already an MP3 in place
+        targets.setdefault(os.path.normcase(os.path.abspath(output_file)), []).append((input_file, output_file))
+
+    for sources in targets.values():
+        if len(sources) > 1:
+            names = ', '.join(input_file for input_file, _ in sources)
+            for input_file, output_file in sources:
+                results.append({'input': input_file, 'output': output_file, 'status': 'failed',
+                                'error': f"several inputs would write '{output_file}': {names}"})
+                print(f"FAILED {input_file}: several inputs would write '{output_file}'")
+            continue
+        input_file, output_file = sources[0]
+        if not force and is_up_to_date(input_file, output_file):
+            results.append({'input': input_file, 'output': output_file, 'status': 'skipped'})
+            continue
+        todo.append((input_file, output_file))
+
+    skipped = sum(1 for result in results if result['status'] == 'skipped')
+    print(f"Converting {len(todo)} file(s) with {jobs} ffmpeg process(es); {skipped} already up to date.")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = []
+        for input_file, output_file in todo:
+            os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+            futures.append(pool.submit(transcode_file, input_file, output_file))
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results.append(result)
+            if result['status'] == 'failed':
+                print(f"[{done}/{len(todo)}] FAILED {result['input']}: {result.get('error')}")
+            else:
+                print(f"[{done}/{len(todo)}] {result['input']} ({result['seconds']}s)")
+
+    elapsed = time.perf_counter() - started
+    converted = sum(1 for result in results if result['status'] == 'converted')
+    failed = sum(1 for result in results if result['status'] == 'failed')
+    print(f"\nBatch complete: {converted} converted, {len(results) - converted - failed} skipped, {failed} failed "
+          f"in {elapsed:.1f}s.")
+    return results
+
+def interactive():
     input_file = input("Enter the full path to the audio file you want to convert: ").strip()
 
     if not os.path.isfile(input_file):
@@ -31,5 +176,32 @@ def main():
 
     convert_audio_to_mp3(input_file, output_file)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert audio files to MP3 with ffmpeg.")
+    parser.add_argument('inputs', nargs='*',
+                        help="Audio files or folders to convert in batch mode (prompted for one file if omitted)")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="ffmpeg processes to run at once (default: one per CPU core)")
+    parser.add_argument('--output-dir', default=None,
+                        help="Write MP3s here, mirroring the folder layout (default: next to each input)")
+    parser.add_argument('--force', action='store_true', help="Convert even if the MP3 is already up to date")
+    parser.add_argument('--report', default=None,
+                        help="Save per-file status, exit code and timing to this JSON file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not args.inputs:
+        interactive()
+        return
+
+    results = batch_convert(args.inputs, jobs=args.jobs, output_dir=args.output_dir, force=args.force)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Report saved to '{args.report}'")
+    if any(result['status'] == 'failed' for result in results):
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()
@@ -1,10 +1,22 @@
 import os
+import argparse
+import tempfile
 import subprocess
 
+# Read once at startup: temp files are created owner-only, and finished MP3s get the usual permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 def convert_to_mp3(input_file, output_file):
     """
     Convert an audio or video file to MP3 format.
-    
+
+    The first audio stream is encoded straight to MP3 in a single ffmpeg pass
+    (video is dropped with -vn), so no intermediate audio file is written.
+    ffmpeg writes to a uniquely named temporary file next to the output, which
+    is renamed into place once it is complete, so several runs can work in the
+    same folder at once.
+
     Args:
     input_file (str): Path to the input audio or video file.
     output_file (str): Path to save the output MP3 audio file.
@@ -13,30 +25,34 @@ def convert_to_mp3(input_file, output_file):
     if not os.path.exists(input_file):
         print("Input file not found.")
         return
-    
-    # Extract audio from video files
-    if input_file.lower().endswith(('.mp4', '.avi', '.mkv', '.mov', '.flv')):
-        try:
-            subprocess.run(['ffmpeg', '-i', input_file, '-vn', '-acodec', 'copy', 'temp_audio.aac'], check=True)
-            input_file = 'temp_audio.aac'
-        except subprocess.CalledProcessError as e:
-            print("Audio extraction failed:", e)
-            return
-    
-    # Convert audio to MP3
+
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    fd, temp_file = tempfile.mkstemp(suffix='.mp3.part', dir=output_dir)
+    os.close(fd)
+
+    # Extract and convert the audio to MP3 in one pass
     try:
-        subprocess.run(['ffmpeg', '-i', input_file, '-acodec', 'libmp3lame', output_file], check=True)
+        subprocess.run(['ffmpeg', '-y', '-nostdin', '-i', input_file, '-map', '0:a:0', '-vn',
+                        '-codec:a', 'libmp3lame', '-f', 'mp3', temp_file], check=True)
+        os.chmod(temp_file, 0o666 & ~_UMASK)
+        os.replace(temp_file, output_file)
         print("Conversion successful!")
     except subprocess.CalledProcessError as e:
         print("Conversion failed:", e)
     finally:
-        # Clean up temporary audio file
-        if input_file == 'temp_audio.aac':
-            os.remove('temp_audio.aac')
-        
+        # Clean up the temporary file if the conversion didn't finish
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the audio from a video (or audio) file as MP3.")
+    parser.add_argument('input_file', nargs='?', help="Video or audio file (prompted if omitted)")
+    parser.add_argument('output_file', nargs='?', help="MP3 to write (default: input name with .mp3)")
+    args = parser.parse_args()
 
-# Example usage:
-input_file = "input_file.ext"  # Replace with the path to your input audio or video file
-output_file = "output_audio.mp3"  # Replace with the desired path for the converted MP3 file
+    input_file = args.input_file or input("Enter the path to your input audio or video file: ").strip()
+    output_file = args.output_file or os.path.splitext(input_file)[0] + ".mp3"
+    convert_to_mp3(input_file, output_file)
 
-convert_to_mp3(input_file, output_file)
+if __name__ == "__main__":
+    main()
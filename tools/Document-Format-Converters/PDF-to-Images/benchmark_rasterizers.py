@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+# Benchmark the PDF rasterizers in this folder on synthetic PDFs.
+# Each run happens in its own process so timings and peak memory don't leak between runs.
+
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+import importlib.util
+from pathlib import Path
+from datetime import datetime
+from PIL import Image
+
+try:
+    import resource  # Peak RSS; not available on Windows
+except ImportError:
+    resource = None
+
+try:
+    import pymupdf as fitz
+except ImportError:
+    import fitz  # PyMuPDF releases before 1.24.3
+
+HERE = Path(__file__).resolve().parent
+BACKENDS = ['poppler', 'pymupdf', 'pymupdf-script']
+# Plain formats plus the encoder profiles of pdf_to_images.py
+FORMATS = ['png', 'jpeg', 'webp', 'fast-png', 'archival-png', 'lossless-webp', 'ocr-tiff']
+# The standalone PyMuPDF script renders one page at a time and saves through the
+# pixmap, so it only runs with 1 worker and only writes PNG and JPEG
+SINGLE_WORKER_BACKENDS = {'pymupdf-script'}
+SCRIPT_FORMATS = {'png', 'jpeg'}
+
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud "
+    "exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat. "
+)
+
+
+def make_text_pdf(path, pages):
+    """Pages filled with small dense text."""
+    document = fitz.open()
+    for page_number in range(pages):
+        page = document.new_page()
+        text = f"Page {page_number + 1}\n" + LOREM * 40
+        page.insert_textbox(fitz.Rect(36, 36, page.rect.width - 36, page.rect.height - 36), text, fontsize=8)
+    document.save(path)
+    document.close()
+
+
+def make_image_pdf(path, pages):
+    """Pages covered by a full-page photo-like (noisy) image, like a scan."""
+    document = fitz.open()
+    for page_number in range(pages):
+        page = document.new_page()
+        noise = [Image.effect_noise((850, 1100), random.randint(40, 80)) for _ in range(3)]
+        image = Image.merge('RGB', noise)
+        stream = tempfile.SpooledTemporaryFile()
+        image.save(stream, format='JPEG', quality=85)
+        stream.seek(0)
+        page.insert_image(page.rect, stream=stream.read())
+    document.save(path)
+    document.close()
+
+
+def make_many_page_pdf(path, pages):
+    """Lots of nearly empty pages, to show per-page overhead."""
+    document = fitz.open()
+    for page_number in range(pages):
+        page = document.new_page()
+        page.insert_text((72, 72), f"Page {page_number + 1}: {LOREM[:60]}", fontsize=11)
+    document.save(path)
+    document.close()
+
+
+DOCUMENTS = {
+    'text': (make_text_pdf, 30),
+    'images': (make_image_pdf, 10),
+    'many-pages': (make_many_page_pdf, 300),
+}
+
+
+def generate_pdfs(work_dir, names, scale=1.0):
+    """Create each synthetic PDF in its own input folder and return {name: pdf path}."""
+    random.seed(0)  # Same documents on every run
+    pdfs = {}
+    for name in names:
+        make, pages = DOCUMENTS[name]
+        folder = work_dir / 'input' / name
+        folder.mkdir(parents=True, exist_ok=True)
+        pdf_path = folder / f"{name}.pdf"
+        if not pdf_path.exists():
+            print(f"Generating {pdf_path.name} ({max(1, int(pages * scale))} pages)...")
+            make(str(pdf_path), max(1, int(pages * scale)))
+        pdfs[name] = pdf_path
+    return pdfs
+
+
+def max_process_rss_mb():
+    """
+    Peak resident set size of the largest single process (this one or a finished child), in MB.
+    Not a total: worker processes running side by side are not added together.
+    """
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_case(case):
+    """Convert one PDF with one backend/setting and measure it. Runs in a child process."""
+    pdf_path = Path(case['pdf'])
+    output_dir = Path(case['output_dir'])
+    started = time.perf_counter()
+
+    if case['backend'] == 'pymupdf-script':
+        spec = importlib.util.spec_from_file_location('pymupdf_script', HERE / 'pdf to images using PyMuPDF.py')
+        script = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(script)
+        # Grayscale, like pdf_to_images.py, so every backend renders the same number of bytes per page
+        script.pdf_to_images(str(pdf_path), str(output_dir), image_format=case['format'], zoom=case['dpi'] / 72,
+                             grayscale=True)
+    else:
+        import logging
+        from pdf_to_images import PDFConverter, PageEncoder
+        logging.getLogger().setLevel(logging.WARNING)
+        profile = case['format'] if case['format'] in PageEncoder.PROFILES else None
+        converter = PDFConverter(str(pdf_path.parent), str(output_dir), backend=case['backend'],
+                                 fmt='png' if profile else case['format'], profile=profile,
+                                 render_workers=case['workers'], encode_workers=case['workers'])
+        converter.dpi = case['dpi']
+        if case['backend'] == 'poppler':
+            converter.setup_directories()
+            converter.convert_pdf(pdf_path, thread_count=case['workers'])
+        else:
+            converter.process_all_pdfs()
+
+    elapsed = time.perf_counter() - started
+    images = [path for path in output_dir.rglob('*') if path.is_file() and path.name != 'manifest.json']
+    if not images:
+        raise RuntimeError("no pages were written")
+    return {
+        'pages': len(images),
+        'seconds': round(elapsed, 3),
+        'pages_per_sec': round(len(images) / elapsed, 2) if elapsed > 0 else None,
+        'max_process_rss_mb': max_process_rss_mb(),
+        'output_bytes': sum(path.stat().st_size for path in images),
+    }
+
+
+def run_case_in_subprocess(case):
+    """Run a case in a fresh Python process and return its measurements (or the error)."""
+    completed = subprocess.run([sys.executable, str(Path(__file__).resolve()), '--run-case', json.dumps(case)],
+                               cwd=HERE, capture_output=True, text=True)
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        error = (completed.stderr.strip().splitlines() or ['no output'])[-1]
+        return {'error': error}
+    return json.loads(lines[-1])
+
+
+def case_key(result):
+    return (result['backend'], result['document'], result['dpi'], result['format'], result['workers'])
+
+
+def compare_with_baseline(results, baseline_path, threshold):
+    """Print the change in pages/sec against an earlier results file, flagging slowdowns."""
+    with open(baseline_path, 'r', encoding='utf-8') as file:
+        baseline = {case_key(result): result for result in json.load(file)['results']}
+
+    regressions = 0
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get(case_key(result))
+        if not before or not before.get('pages_per_sec') or not result.get('pages_per_sec'):
+            continue
+        change = (result['pages_per_sec'] - before['pages_per_sec']) / before['pages_per_sec']
+        flag = ''
+        if change < -threshold:
+            flag = '  <-- REGRESSION'
+            regressions += 1
+        print(f"  {' / '.join(str(part) for part in case_key(result))}: "
+              f"{before['pages_per_sec']} -> {result['pages_per_sec']} pages/sec ({change:+.0%}){flag}")
+    return regressions
+
+
+def print_table(results):
+    header = f"{'backend':<15} {'document':<11} {'dpi':>4} {'format':<13} {'workers':>7} " \
+             f"{'pages/sec':>9} {'max proc MB':>11} {'output MB':>9}"
+    print("\n" + header)
+    print("-" * len(header))
+    for result in results:
+        prefix = f"{result['backend']:<15} {result['document']:<11} {result['dpi']:>4} " \
+                 f"{result['format']:<13} {result['workers']:>7} "
+        if 'error' in result:
+            print(prefix + f"FAILED: {result['error']}")
+            continue
+        peak = result['max_process_rss_mb'] if result['max_process_rss_mb'] is not None else '-'
+        print(prefix + f"{result['pages_per_sec']:>9} {peak:>11} {result['output_bytes'] / 1e6:>9.1f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the poppler and PyMuPDF rasterizers on synthetic PDFs.")
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=BACKENDS,
+                        help="Backends to run (default: all)")
+    parser.add_argument('--documents', nargs='+', choices=list(DOCUMENTS), default=list(DOCUMENTS),
+                        help="Synthetic documents to convert (default: all)")
+    parser.add_argument('--dpi', nargs='+', type=int, default=[150, 300], help="DPI values (default: 150 300)")
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=['png'],
+                        help="Output formats or encoder profiles (default: png)")
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, os.cpu_count() or 1],
+                        help="Worker counts: poppler threads or PyMuPDF processes (default: 1 and CPU count)")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Multiply the page count of every synthetic document, e.g. 0.1 for a quick run")
+    parser.add_argument('--work-dir', default=None,
+                        help="Keep generated PDFs and output here instead of a temporary folder")
+    parser.add_argument('--output', default=None,
+                        help="Results file (default: benchmark_results_<timestamp>.json)")
+    parser.add_argument('--baseline', default=None,
+                        help="Earlier results file to compare pages/sec against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Slowdown versus the baseline reported as a regression (default: 0.10 = 10%%)")
+    parser.add_argument('--run-case', default=None, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return
+
+    work_dir = Path(args.work_dir) if args.work_dir else Path(tempfile.mkdtemp(prefix='pdf-benchmark-'))
+    results = []
+    try:
+        pdfs = generate_pdfs(work_dir, args.documents, args.scale)
+        cases = [
+            {'backend': backend, 'document': document, 'dpi': dpi, 'format': fmt, 'workers': workers}
+            for backend in args.backends
+            for document in args.documents
+            for dpi in args.dpi
+            for fmt in args.formats
+            for workers in sorted(set(args.workers))
+            if (workers == 1 or backend not in SINGLE_WORKER_BACKENDS)
+            and (fmt in SCRIPT_FORMATS or backend != 'pymupdf-script')
+        ]
+
+        for number, case in enumerate(cases, start=1):
+            output_dir = work_dir / 'output' / f"run_{number:03d}"
+            shutil.rmtree(output_dir, ignore_errors=True)
+            output_dir.parent.mkdir(parents=True, exist_ok=True)
+            print(f"[{number}/{len(cases)}] {case['backend']} / {case['document']} / {case['dpi']} dpi / "
+                  f"{case['format']} / {case['workers']} worker(s)")
+            measured = run_case_in_subprocess(dict(case, pdf=str(pdfs[case['document']]),
+                                                   output_dir=str(output_dir)))
+            results.append(dict(case, **measured))
+            shutil.rmtree(output_dir, ignore_errors=True)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_table(results)
+
+    output_path = args.output or f"benchmark_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump({
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'machine': {
+                'platform': platform.platform(),
+                'python': platform.python_version(),
+                'cpu_count': os.cpu_count(),
+                'pymupdf': getattr(fitz, 'VersionBind', None),
+            },
+            'scale': args.scale,
+            'results': results,
+        }, file, indent=2)
+    print(f"\nResults saved to {output_path}")
+
+    if args.baseline and compare_with_baseline(results, args.baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
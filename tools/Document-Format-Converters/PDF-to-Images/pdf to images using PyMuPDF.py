@@ -3,7 +3,7 @@
 import fitz  # PyMuPDF
 import os
 
-def pdf_to_images(pdf_path, output_folder, image_format="png", zoom=2):
+def pdf_to_images(pdf_path, output_folder, image_format="png", zoom=2, grayscale=False):
     """
     Convert each page of a PDF to an image.
 
@@ -11,6 +11,7 @@ def pdf_to_images(pdf_path, output_folder, image_format="png", zoom=2):
     :param output_folder: Folder where the images will be saved.
     :param image_format: Format of the output images (e.g., 'png', 'jpeg').
     :param zoom: Zoom factor to increase the resolution of the output images.
+    :param grayscale: Render grayscale pages instead of RGB.
     """
     # Open the PDF file
     pdf_document = fitz.open(pdf_path)
@@ -19,16 +20,16 @@ def pdf_to_images(pdf_path, output_folder, image_format="png", zoom=2):
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
+    # Set the zoom factor once; the same matrix is reused for every page
+    mat = fitz.Matrix(zoom, zoom)
+
     # Iterate through each page
     for page_num in range(len(pdf_document)):
         # Get the page
         page = pdf_document.load_page(page_num)
 
-        # Set the zoom factor
-        mat = fitz.Matrix(zoom, zoom)
-
         # Render the page to an image (pix)
-        pix = page.get_pixmap(matrix=mat, alpha=False)
+        pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY if grayscale else fitz.csRGB, alpha=False)
 
         # Save the image
         image_path = os.path.join(output_folder, f"slide_{page_num + 1}.{image_format}")
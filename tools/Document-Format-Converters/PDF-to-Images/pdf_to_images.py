@@ -1,11 +1,29 @@
+import io
 import os
+import math
+import re
 import sys
+import json
+import queue
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from pdf2image.exceptions import PDFPageCountError, PDFSyntaxError
+from PIL import Image
 import logging
 from tqdm import tqdm
 
+try:
+    import pymupdf as fitz  # PyMuPDF: only needed for --backend pymupdf
+except ImportError:
+    try:
+        import fitz  # PyMuPDF releases before 1.24.3
+    except ImportError:
+        fitz = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -13,13 +31,245 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def parse_size(text):
+    """Parse a memory size like '512M', '2G' or a plain byte count."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?)B?\s*', text, re.IGNORECASE)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid size: {text}")
+    number, unit = match.groups()
+    return int(float(number) * 1024 ** ' KMG'.index(unit.upper() or ' '))
+
+class PageEncoder:
+    """
+    Turns a rendered page into image file bytes.
+
+    Either pick a format (PNG, JPEG, WEBP) with an optional compression setting -
+    the zlib level (0-9) for PNG or the quality (1-100) for JPEG and WebP - or
+    one of the PROFILES, which sets everything at once.
+    """
+
+    EXTENSIONS = {'PNG': 'png', 'JPEG': 'jpg', 'WEBP': 'webp', 'TIFF': 'tif'}
+    COMPRESSION_RANGES = {'PNG': (0, 9), 'JPEG': (1, 100), 'WEBP': (1, 100)}
+    PROFILES = {
+        # zlib level 1: several times faster than optimize=True, files a little larger
+        'fast-png': {'format': 'PNG', 'options': {'compress_level': 1}},
+        # Smallest PNGs: full zlib search, slowest
+        'archival-png': {'format': 'PNG', 'options': {'optimize': True}},
+        'lossless-webp': {'format': 'WEBP', 'options': {'lossless': True, 'quality': 80, 'method': 4}},
+        # Black and white CCITT Group 4, tiny files for OCR
+        'ocr-tiff': {'format': 'TIFF', 'options': {'compression': 'group4'}, 'bilevel': True},
+    }
+
+    def __init__(self, fmt='PNG', compression=None, profile=None):
+        self.bilevel = False
+        if profile:
+            settings = self.PROFILES[profile]
+            self.fmt = settings['format']
+            self.options = settings['options']
+            self.bilevel = settings.get('bilevel', False)
+            self.label = profile
+        else:
+            self.fmt = fmt.upper()
+            if compression is not None:
+                low, high = self.COMPRESSION_RANGES[self.fmt]
+                if not low <= compression <= high:
+                    raise ValueError(f"{self.fmt} compression must be between {low} and {high}, got {compression}")
+            if self.fmt == 'PNG':
+                # Without a level PNG keeps its original behaviour: the slow optimize search
+                self.options = {'compress_level': compression} if compression is not None else {'optimize': True}
+            else:
+                self.options = {'quality': compression if compression is not None else 95}
+            self.label = self.fmt if compression is None else f"{self.fmt}/{compression}"
+        self.extension = self.EXTENSIONS[self.fmt]
+
+    def encode(self, image):
+        if self.bilevel:
+            # Plain threshold rather than dithering, which OCR handles badly
+            image = image.convert('L').point(lambda value: 255 if value >= 128 else 0, mode='1')
+        buffer = io.BytesIO()
+        image.save(buffer, format=self.fmt, **self.options)
+        return buffer.getvalue()
+
+# Each PyMuPDF worker process keeps its current document open between chunks
+_mupdf_document = None
+
+def _open_mupdf_document(pdf_path):
+    global _mupdf_document
+    if _mupdf_document is None or _mupdf_document[0] != pdf_path:
+        if _mupdf_document is not None:
+            _mupdf_document[1].close()
+        _mupdf_document = (pdf_path, fitz.open(pdf_path))
+    return _mupdf_document[1]
+
+def _write_page(image, page_path, encoder):
+    data = encoder.encode(image)
+    page_path.write_bytes(data)
+    return hashlib.sha256(data).hexdigest(), len(data)
+
+def _render_chunk_mupdf(pdf_path, doc_dir, page_numbers, dpi, page_encoder):
+    """
+    PyMuPDF worker: render and save a chunk of pages from one document.
+
+    Encoding runs on a helper thread (Pillow releases the GIL while encoding),
+    so the next page renders while the previous one is compressed and written.
+    Returns (page_number, filename, sha256, bytes) for each page.
+    """
+    document = _open_mupdf_document(pdf_path)
+    zoom = dpi / 72
+    matrix = fitz.Matrix(zoom, zoom)  # Built once per chunk, not per page
+    results = []
+    previous = None
+    with ThreadPoolExecutor(max_workers=1) as encoder:
+        for page_number in page_numbers:
+            pix = document.load_page(page_number - 1).get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, alpha=False)
+            image = Image.frombytes('L', (pix.width, pix.height), pix.samples)
+            filename = f"page_{str(page_number).zfill(3)}.{page_encoder.extension}"
+            # At most one page waits for the encoder, so memory stays at two pages
+            if previous is not None:
+                results.append(previous[:2] + previous[2].result())
+            previous = (page_number, filename,
+                        encoder.submit(_write_page, image, Path(doc_dir) / filename, page_encoder))
+        if previous is not None:
+            results.append(previous[:2] + previous[2].result())
+    return results
+
+class JobManifest:
+    """
+    Record of the pages already written for one document, stored as manifest.json
+    in the document's output folder so interrupted batches can resume.
+    """
+
+    FILENAME = 'manifest.json'
+    FLUSH_EVERY = 10  # Pages recorded between manifest writes
+
+    def __init__(self, doc_dir, pdf_path, dpi, fmt):
+        self.doc_dir = Path(doc_dir)
+        self.path = self.doc_dir / self.FILENAME
+        self.lock = threading.Lock()
+        self._save_lock = threading.Lock()  # One writer of the temp file at a time
+        stat = pdf_path.stat()
+        self.source = {'name': pdf_path.name, 'size': stat.st_size, 'mtime': stat.st_mtime}
+        self.settings = {'dpi': dpi, 'format': fmt}
+        self.page_count = None
+        self.pages = {}
+        self.complete = False
+        self._unsaved = 0
+        self._load()
+
+    def _load(self):
+        """Reuse an existing manifest only if the source PDF and settings are unchanged."""
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return
+        if data.get('source') != self.source or data.get('settings') != self.settings:
+            logger.info(f"{self.source['name']}: source or settings changed, converting from scratch")
+            return
+        self.page_count = data.get('page_count')
+        self.pages = {int(number): entry for number, entry in data.get('pages', {}).items()}
+        self.complete = data.get('complete', False)
+
+    def save(self):
+        """Write the manifest atomically. Safe to call from several threads."""
+        with self._save_lock:
+            with self.lock:
+                data = {
+                    'source': self.source,
+                    'settings': self.settings,
+                    'page_count': self.page_count,
+                    'complete': self.complete,
+                    'pages': {str(number): entry for number, entry in sorted(self.pages.items())}
+                }
+                self._unsaved = 0
+            tmp_path = self.path.with_suffix('.json.tmp')
+            tmp_path.write_text(json.dumps(data, indent=2), encoding='utf-8')
+            os.replace(tmp_path, self.path)
+
+    def forget_pages(self, page_numbers):
+        """Drop records for pages that are missing or changed on disk."""
+        with self.lock:
+            for page_number in page_numbers:
+                if self.pages.pop(page_number, None) is not None:
+                    self.complete = False
+
+    def set_page_count(self, page_count):
+        self.page_count = page_count
+        self._check_complete()
+
+    def page_done(self, page_number, verify=False):
+        """Check whether a page was written by an earlier run and is still on disk."""
+        entry = self.pages.get(page_number)
+        if not entry:
+            return False
+        page_path = self.doc_dir / entry['file']
+        try:
+            if page_path.stat().st_size != entry['bytes']:
+                return False
+            if verify:
+                return hashlib.sha256(page_path.read_bytes()).hexdigest() == entry['sha256']
+        except OSError:
+            return False
+        return True
+
+    def record_page(self, page_number, filename, data):
+        """Record a page that has just been written."""
+        self.record_page_info(page_number, filename, hashlib.sha256(data).hexdigest(), len(data))
+
+    def record_page_info(self, page_number, filename, sha256, size):
+        """Record a page written elsewhere (e.g. by a worker process) from its hash and size."""
+        with self.lock:
+            self.pages[page_number] = {
+                'file': filename,
+                'sha256': sha256,
+                'bytes': size
+            }
+            self._unsaved += 1
+            # Decide and reset in one step, so only one thread flushes each batch of pages
+            flush = self._unsaved >= self.FLUSH_EVERY
+            if flush:
+                self._unsaved = 0
+        if not self._check_complete() and flush:
+            self.save()
+
+    def _check_complete(self):
+        """Mark the document complete once every page is recorded. Returns True if it just completed."""
+        with self.lock:
+            if self.complete or self.page_count is None or len(self.pages) < self.page_count:
+                return False
+            self.complete = True
+        self.save()
+        return True
+
 class PDFConverter:
-    def __init__(self, input_dir='Input-Files', output_dir='Output-Images'):
-        """Initialize the PDF converter with input and output directories."""
+    DEFAULT_CHUNK_SIZE = 16  # Pages rendered per poppler call when no memory budget is set
+
+    def __init__(self, input_dir='Input-Files', output_dir='Output-Images', chunk_size=None, max_memory=None,
+                 verify_existing=False, backend='poppler', fmt='PNG', compression=None, render_workers=None,
+                 profile=None, encode_workers=None):
+        """
+        Initialize the PDF converter with input and output directories.
+
+        Pages are rendered chunk_size pages at a time. If max_memory (bytes) is set
+        instead, the chunk size is picked per document to stay within that budget.
+        Each PDF gets its own folder under output_dir with a manifest, and pages
+        already recorded there are skipped (re-hashed first if verify_existing).
+        backend 'pymupdf' renders with PyMuPDF across render_workers processes
+        instead of poppler. Pages are encoded by a PageEncoder built from fmt and
+        compression, or from an encoder profile, on encode_workers threads.
+        """
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.dpi = 300  # High resolution for OCR
-        self.fmt = 'PNG'  # PNG format for better quality
+        self.encoder = PageEncoder(fmt, compression, profile)  # PNG format by default for better quality
+        self.fmt = self.encoder.fmt
+        self.encode_workers = encode_workers or os.cpu_count() or 1
+        self.backend = backend
+        self.render_workers = render_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.max_memory = max_memory
+        self.concurrent_docs = 1  # Documents sharing the memory budget
+        self.pipeline_pages = 0  # Pages that can sit in the pipelined save queue or be saving
+        self.verify_existing = verify_existing
         
     def setup_directories(self):
         """Create input and output directories if they don't exist."""
@@ -39,33 +289,158 @@ class PDFConverter:
         
         return list(self.input_dir.glob('*.pdf'))
     
-    def convert_pdf(self, pdf_path):
-        """Convert a single PDF file to images."""
-        try:
-            logger.info(f"Processing {pdf_path.name}")
-            
-            # Convert PDF to images
+    def _page_bytes(self, info):
+        """Estimate the in-memory size of one rendered page from pdfinfo's page size."""
+        match = re.search(r'([\d.]+) x ([\d.]+)', info.get('Page size', ''))
+        width_pts, height_pts = (float(match.group(1)), float(match.group(2))) if match else (612.0, 792.0)
+        # Grayscale pages are one byte per pixel; poppler's PPM output is read alongside the decoded image
+        return int(width_pts / 72 * self.dpi) * int(height_pts / 72 * self.dpi) * 2
+
+    def _encode_window(self, info):
+        """
+        How many rendered pages may wait for the encode pool. With a memory budget
+        the window is capped at half of it, leaving the rest for the render chunk.
+        """
+        window = self.encode_workers * 2
+        if self.max_memory:
+            window = min(window, max(1, self.max_memory // 2 // self._page_bytes(info)))
+        return window
+
+    def _chunk_size_for(self, info, held_pages=0):
+        """
+        Pick how many pages to render per poppler call. held_pages rendered pages
+        are already waiting to be saved, so they come out of the memory budget first.
+        """
+        if self.chunk_size:
+            return self.chunk_size
+        if self.max_memory:
+            page_bytes = self._page_bytes(info)
+            budget = (self.max_memory - held_pages * page_bytes) // max(1, self.concurrent_docs)
+            if budget < page_bytes:
+                logger.warning(f"Memory budget is used up by {held_pages} pages waiting to be saved; "
+                               f"rendering one page at a time (lower --queue-size to stay within it)")
+            return max(1, budget // page_bytes)
+        return self.DEFAULT_CHUNK_SIZE
+
+    def _page_ranges(self, page_numbers, chunk_size):
+        """Group page numbers into contiguous (first, last) ranges of at most chunk_size pages."""
+        ranges = []
+        for page_number in page_numbers:
+            if ranges and ranges[-1][1] == page_number - 1 and page_number - ranges[-1][0] < chunk_size:
+                ranges[-1][1] = page_number
+            else:
+                ranges.append([page_number, page_number])
+        return ranges
+
+    def _pages_to_convert(self, page_count, manifest=None):
+        """Return the page numbers not already recorded in the manifest."""
+        page_numbers = list(range(1, page_count + 1))
+        if manifest is not None:
+            page_numbers = [n for n in page_numbers if not manifest.page_done(n, self.verify_existing)]
+            manifest.forget_pages(page_numbers)
+            manifest.set_page_count(page_count)
+        return page_numbers
+
+    def _render_pages(self, pdf_path, thread_count=None, manifest=None, info=None, held_pages=0):
+        """
+        Yield (page_number, image) for each page of a PDF that still needs converting.
+
+        Pages are rendered a chunk at a time with first_page/last_page, and each
+        page is released once the caller is done with it, so peak memory depends
+        on the chunk size (plus the held_pages the caller keeps) rather than the page count.
+        """
+        info = info or pdfinfo_from_path(pdf_path)
+        page_count = int(info['Pages'])
+        chunk_size = self._chunk_size_for(info, held_pages)
+
+        page_numbers = self._pages_to_convert(page_count, manifest)
+        logger.info(f"{pdf_path.name}: {len(page_numbers)} of {page_count} pages to convert, "
+                    f"rendering {chunk_size} at a time")
+
+        for first_page, last_page in self._page_ranges(page_numbers, chunk_size):
             images = convert_from_path(
                 pdf_path,
                 dpi=self.dpi,
-                fmt=self.fmt.lower(),
-                thread_count=os.cpu_count(),  # Optimize for multi-core systems
+                fmt='ppm',  # Raw pixels from poppler: no PNG encode and decode before our own encoder
+                thread_count=min(thread_count or os.cpu_count(), last_page - first_page + 1),  # Optimize for multi-core systems
                 grayscale=True,  # Better for OCR
-                size=(None, None)  # Maintain original size
+                size=(None, None),  # Maintain original size
+                first_page=first_page,
+                last_page=last_page
             )
+            # Hand pages over one at a time so each can be freed once it is saved
+            images.reverse()
+            page_number = first_page - 1
+            while images:
+                page_number += 1
+                yield page_number, images.pop()
+
+    def _document_dir(self, pdf_path):
+        """Return the output folder for one PDF, so documents never overwrite each other."""
+        return self.output_dir / pdf_path.stem
+
+    def _page_filename(self, page_number):
+        return f"page_{str(page_number).zfill(3)}.{self.encoder.extension}"
+
+    def _save_page(self, manifest, page_number, image):
+        """Encode one page, write it to the document's folder and record it in the manifest."""
+        data = self.encoder.encode(image)
+        filename = self._page_filename(page_number)
+        (manifest.doc_dir / filename).write_bytes(data)
+        manifest.record_page(page_number, filename, data)
+
+    def _save_and_close(self, manifest, page_number, image):
+        try:
+            self._save_page(manifest, page_number, image)
+        finally:
+            image.close()
+
+    def convert_pdf(self, pdf_path, thread_count=None, on_page=None):
+        """
+        Convert a single PDF file to images in its own output folder.
+
+        Pages recorded in the folder's manifest by an earlier run are skipped.
+        If on_page is given, each (manifest, page_number, image) is handed to it
+        instead of being saved here, so saving can happen on other threads.
+        """
+        manifest = None
+        try:
+            logger.info(f"Processing {pdf_path.name}")
+
+            doc_dir = self._document_dir(pdf_path)
+            doc_dir.mkdir(parents=True, exist_ok=True)
+            manifest = JobManifest(doc_dir, pdf_path, self.dpi, self.encoder.label)
+            if manifest.complete and not self.verify_existing:
+                logger.info(f"Skipping {pdf_path.name}: already converted")
+                return 0
             
-            # Save images with progress bar
-            for i, image in enumerate(tqdm(images, desc="Converting pages")):
-                output_path = self.output_dir / f"page_{str(i + 1).zfill(3)}.{self.fmt.lower()}"
-                image.save(
-                    output_path,
-                    format=self.fmt,
-                    optimize=True,
-                    quality=95  # High quality
-                )
+            pages = 0
+            if on_page is not None:
+                for page_number, image in self._render_pages(pdf_path, thread_count, manifest,
+                                                             held_pages=self.pipeline_pages):
+                    on_page(manifest, page_number, image)
+                    pages += 1
+            else:
+                # Convert PDF to images and save them with a progress bar. Encoding runs on
+                # a thread pool (Pillow releases the GIL) while poppler renders the next pages.
+                info = pdfinfo_from_path(pdf_path)
+                window = self._encode_window(info)
+                with ThreadPoolExecutor(max_workers=self.encode_workers) as encode_pool:
+                    in_flight = []
+                    for page_number, image in tqdm(self._render_pages(pdf_path, thread_count, manifest,
+                                                                      info=info, held_pages=window),
+                                                   desc="Converting pages", unit="page"):
+                        # Cap the pages waiting to be encoded so memory stays bounded
+                        if len(in_flight) >= window:
+                            in_flight.pop(0).result()
+                        in_flight.append(encode_pool.submit(self._save_and_close, manifest, page_number, image))
+                        pages += 1
+                    for future in in_flight:
+                        future.result()
+                manifest.save()
             
-            logger.info(f"Successfully converted {len(images)} pages from {pdf_path.name}")
-            return len(images)
+            logger.info(f"Successfully converted {pages} pages from {pdf_path.name}")
+            return pages
             
         except PDFPageCountError:
             logger.error(f"Error: Invalid or corrupt PDF file: {pdf_path}")
@@ -75,10 +450,131 @@ class PDFConverter:
             return 0
         except Exception as e:
             logger.error(f"Unexpected error processing {pdf_path}: {str(e)}")
+            # Keep whatever was written so a rerun can resume from there
+            if manifest is not None and on_page is None:
+                manifest.save()
             return 0
 
-    def process_all_pdfs(self):
-        """Process all PDF files in the input directory."""
+    def _process_pipelined(self, pdf_files, jobs, save_workers, queue_size):
+        """
+        Rasterize several PDFs at once while a separate pool encodes and saves pages.
+
+        Rendered pages wait in a bounded queue, so rasterizers pause when saving falls
+        behind and at most queue_size pages are held in memory.
+        """
+        page_queue = queue.Queue(maxsize=queue_size)
+        # Queued pages plus one being saved per worker come out of the memory budget
+        self.pipeline_pages = queue_size + save_workers
+        # Share the cores between documents instead of giving each one all of them
+        thread_count = max(1, (os.cpu_count() or 1) // jobs)
+        progress = tqdm(desc="Saving pages", unit="page")
+        save_errors = []
+        manifests = {}
+
+        def save_loop():
+            while True:
+                item = page_queue.get()
+                if item is None:
+                    break
+                manifest, page_number, image = item
+                manifests[manifest.path] = manifest
+                try:
+                    self._save_page(manifest, page_number, image)
+                    progress.update(1)
+                except Exception as e:
+                    logger.error(f"Error saving page {page_number} of {manifest.source['name']}: {str(e)}")
+                    save_errors.append((manifest.source['name'], page_number))
+                finally:
+                    image.close()
+
+        savers = [threading.Thread(target=save_loop, daemon=True) for _ in range(save_workers)]
+        for saver in savers:
+            saver.start()
+
+        total_pages = 0
+        try:
+            with ThreadPoolExecutor(max_workers=jobs) as raster_pool:
+                futures = [
+                    raster_pool.submit(self.convert_pdf, pdf_file, thread_count,
+                                       lambda *page: page_queue.put(page))
+                    for pdf_file in pdf_files
+                ]
+                for future in as_completed(futures):
+                    total_pages += future.result()
+        finally:
+            for _ in savers:
+                page_queue.put(None)
+            for saver in savers:
+                saver.join()
+            progress.close()
+            # Flush pages recorded since the last manifest write
+            for manifest in manifests.values():
+                manifest.save()
+
+        if save_errors:
+            logger.warning(f"{len(save_errors)} pages could not be saved")
+        return total_pages - len(save_errors)
+
+    def _process_pymupdf(self, pdf_files):
+        """
+        Render all PDFs with PyMuPDF, splitting each document's pages into chunks
+        spread across a pool of worker processes.
+        """
+        if fitz is None:
+            raise ImportError("The pymupdf backend requires PyMuPDF (pip install PyMuPDF)")
+
+        progress = tqdm(desc="Converting pages", unit="page")
+        total_pages = 0
+        with ProcessPoolExecutor(max_workers=self.render_workers) as pool:
+            futures = {}
+            for pdf_path in pdf_files:
+                try:
+                    doc_dir = self._document_dir(pdf_path)
+                    doc_dir.mkdir(parents=True, exist_ok=True)
+                    manifest = JobManifest(doc_dir, pdf_path, self.dpi, self.encoder.label)
+                    if manifest.complete and not self.verify_existing:
+                        logger.info(f"Skipping {pdf_path.name}: already converted")
+                        continue
+                    with fitz.open(pdf_path) as document:
+                        page_count = document.page_count
+                except Exception as e:
+                    logger.error(f"Error: could not open {pdf_path}: {str(e)}")
+                    continue
+
+                page_numbers = self._pages_to_convert(page_count, manifest)
+                # Small documents are split too, so every render worker gets a share of the pages
+                chunk_size = max(1, min(self.chunk_size or self.DEFAULT_CHUNK_SIZE,
+                                        math.ceil(len(page_numbers) / self.render_workers)))
+                logger.info(f"{pdf_path.name}: {len(page_numbers)} of {page_count} pages to convert, "
+                            f"{chunk_size} per worker task")
+                for start in range(0, len(page_numbers), chunk_size):
+                    chunk = page_numbers[start:start + chunk_size]
+                    future = pool.submit(_render_chunk_mupdf, str(pdf_path), str(doc_dir), chunk,
+                                         self.dpi, self.encoder)
+                    futures[future] = (pdf_path, manifest)
+
+            for future in as_completed(futures):
+                pdf_path, manifest = futures[future]
+                try:
+                    for page_number, filename, sha256, size in future.result():
+                        manifest.record_page_info(page_number, filename, sha256, size)
+                        total_pages += 1
+                        progress.update(1)
+                except Exception as e:
+                    logger.error(f"Unexpected error processing {pdf_path}: {str(e)}")
+
+        progress.close()
+        for manifest in {id(m): m for _, m in futures.values()}.values():
+            manifest.save()
+        return total_pages
+
+    def process_all_pdfs(self, jobs=1, save_workers=None, queue_size=None):
+        """
+        Process all PDF files in the input directory.
+
+        With jobs > 1, up to `jobs` PDFs are rasterized at once and pages are saved
+        by `save_workers` threads through a queue of at most `queue_size` pages.
+        """
         try:
             self.setup_directories()
             pdf_files = self.get_pdf_files()
@@ -88,9 +584,17 @@ class PDFConverter:
                 return
             
             total_pages = 0
-            for pdf_file in pdf_files:
-                pages = self.convert_pdf(pdf_file)
-                total_pages += pages
+            self.concurrent_docs = jobs
+            if self.backend == 'pymupdf':
+                total_pages = self._process_pymupdf(pdf_files)
+            elif jobs > 1:
+                save_workers = save_workers or os.cpu_count() or 1
+                queue_size = queue_size or save_workers * 2
+                total_pages = self._process_pipelined(pdf_files, jobs, save_workers, queue_size)
+            else:
+                for pdf_file in pdf_files:
+                    pages = self.convert_pdf(pdf_file)
+                    total_pages += pages
             
             logger.info(f"Conversion complete. Total pages processed: {total_pages}")
             
@@ -98,13 +602,54 @@ class PDFConverter:
             logger.error(f"Error during processing: {str(e)}")
             raise
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert every PDF in a folder to page images.")
+    parser.add_argument('--input-dir', default='Input-Files', help="Folder containing PDFs (default: Input-Files)")
+    parser.add_argument('--output-dir', default='Output-Images', help="Folder for page images (default: Output-Images)")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Number of PDFs to rasterize at once; above 1 enables the pipelined mode (default: 1)")
+    parser.add_argument('--save-workers', type=int, default=None,
+                        help="Threads encoding and saving pages in pipelined mode (default: CPU count)")
+    parser.add_argument('--queue-size', type=int, default=None,
+                        help="Max rendered pages waiting to be saved in pipelined mode (default: 2 x save workers)")
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help=f"Pages rendered per poppler call (default: {PDFConverter.DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--max-memory', type=parse_size, default=None,
+                        help="Approximate memory budget for rendered pages, e.g. 512M or 2G; picks the chunk size")
+    parser.add_argument('--verify-existing', action='store_true',
+                        help="Re-hash pages from earlier runs before skipping them")
+    parser.add_argument('--backend', choices=['poppler', 'pymupdf'], default='poppler',
+                        help="Renderer: poppler via pdf2image (default) or PyMuPDF, which is faster")
+    parser.add_argument('--render-workers', type=int, default=None,
+                        help="Processes sharing the pages with the pymupdf backend (default: CPU count)")
+    parser.add_argument('--format', choices=['png', 'jpeg', 'webp'], default='png',
+                        help="Image format for saved pages (default: png)")
+    parser.add_argument('--compression', type=int, default=None,
+                        help="PNG zlib level 0-9, or JPEG/WebP quality 1-100")
+    parser.add_argument('--profile', choices=list(PageEncoder.PROFILES), default=None,
+                        help="Encoder profile; overrides --format and --compression")
+    parser.add_argument('--encode-workers', type=int, default=None,
+                        help="Threads encoding pages while the next ones render (default: CPU count)")
+    args = parser.parse_args()
+    if args.compression is not None and not args.profile:
+        low, high = PageEncoder.COMPRESSION_RANGES[args.format.upper()]
+        if not low <= args.compression <= high:
+            parser.error(f"--compression for {args.format} must be between {low} and {high}")
+    return args
+
 def main():
     try:
-        converter = PDFConverter()
-        converter.process_all_pdfs()
+        args = parse_args()
+        converter = PDFConverter(args.input_dir, args.output_dir,
+                                 chunk_size=args.chunk_size, max_memory=args.max_memory,
+                                 verify_existing=args.verify_existing, backend=args.backend,
+                                 fmt=args.format, compression=args.compression,
+                                 render_workers=args.render_workers, profile=args.profile,
+                                 encode_workers=args.encode_workers)
+        converter.process_all_pdfs(jobs=args.jobs, save_workers=args.save_workers, queue_size=args.queue_size)
     except Exception as e:
         logger.error(f"Application error: {str(e)}")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -3,66 +3,303 @@
 # Run file and provide the path to your PDF. The PDF will be converted and saved as Markdown
 
 import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
 import pdfplumber
+import pypdfium2
 import pytesseract
-from pdf2image import convert_from_path
 from PIL import Image
 
 # Tell pytesseract where the tesseract.exe is located
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
 
-def pdf_to_markdown(pdf_path, md_path):
+# Each OCR worker keeps the PDF open and renders pages straight from it
+_ocr_document = None
+
+
+def _init_ocr_worker(pdf_path):
+    """Open the PDF once per OCR worker and limit it to one tesseract thread."""
+    global _ocr_document
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')  # Don't oversubscribe cores across workers
+    _ocr_document = pypdfium2.PdfDocument(pdf_path)
+
+
+def ocr_page(page_number, dpi=300):
+    """
+    Render one page from the worker's open PDF and run OCR on it.
+    Returns the recognised text, or None if the page could not be rendered.
+    """
+    try:
+        page = _ocr_document[page_number - 1]
+        img = page.render(scale=dpi / 72, grayscale=True).to_pil()
+        page.close()
+    except pypdfium2.PdfiumError:
+        return None
+    return pytesseract.image_to_string(img)
+
+
+class MarkdownPageWriter:
+    """
+    Writes Markdown one page at a time, in page order, flushing each page as soon
+    as it is written. Progress is kept in '<md_path>.progress' so an interrupted
+    run can pick up after the last completed page. Use md_path '-' for stdout.
+    """
+
+    def __init__(self, pdf_path, md_path):
+        self.to_stdout = md_path == '-'
+        self.md_path = md_path
+        self.progress_path = None if self.to_stdout else md_path + '.progress'
+        stat = os.stat(pdf_path)
+        self.source = {'pdf': os.path.abspath(pdf_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+        self.pages_done = 0
+
+        if self.to_stdout:
+            self.stream = sys.stdout
+        else:
+            self.stream = self._open_for_resume()
+            # Mark the file as in progress right away, so a failed run is never mistaken for a finished one
+            self._save_progress()
+
+    def _open_for_resume(self):
+        """Open the Markdown file, continuing a previous run if its progress record still matches."""
+        try:
+            with open(self.progress_path, 'r', encoding='utf-8') as progress_file:
+                progress = json.load(progress_file)
+            if progress['source'] == self.source and os.path.getsize(self.md_path) >= progress['bytes']:
+                # Drop anything written after the last completed page
+                os.truncate(self.md_path, progress['bytes'])
+                self.pages_done = progress['pages_done']
+                return open(self.md_path, 'a', encoding='utf-8')
+        except (OSError, ValueError, KeyError):
+            pass
+        return open(self.md_path, 'w', encoding='utf-8')
+
+    def write_page(self, page_number, body):
+        """Write one page. Pages must arrive in order."""
+        if page_number > 1:
+            self.stream.write("\n")
+        self.stream.write(f"## Page {page_number}\n\n{body}")
+        self.stream.flush()
+        self.pages_done = page_number
+        if self.progress_path:
+            self._save_progress()
+
+    def _save_progress(self):
+        progress = {'source': self.source, 'pages_done': self.pages_done, 'bytes': self.stream.tell()}
+        tmp_path = self.progress_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as progress_file:
+            json.dump(progress, progress_file)
+        os.replace(tmp_path, self.progress_path)
+
+    def close(self, complete):
+        """Close the output. The progress record is removed once the document is complete."""
+        if not self.to_stdout:
+            self.stream.close()
+            if complete and os.path.exists(self.progress_path):
+                os.remove(self.progress_path)
+
+
+def _ocr_body(ocr_text):
+    if ocr_text is not None:
+        return ocr_text.strip() + "\n"
+    return "[ERROR] Unable to convert PDF page to image.\n"
+
+
+def pdf_to_markdown(pdf_path, md_path, ocr_workers=None):
     """
     Converts a PDF file to Markdown.
     If a PDF page has text, the text is extracted.
     If the page is likely scanned (i.e., no text is found),
-    OCR is performed on that page.
+    OCR is performed on that page in a pool of ocr_workers processes
+    (default: one per CPU) while text extraction carries on.
+    Each page is written as soon as it and every page before it are ready.
+    """
+    writer = MarkdownPageWriter(pdf_path, md_path)
+    first_page = writer.pages_done + 1
+    pending = {}  # page number -> text, or Future for pages waiting on OCR
+    next_page = first_page
+    complete = False
+
+    def write_ready_pages(wait):
+        nonlocal next_page
+        while next_page in pending:
+            item = pending[next_page]
+            if isinstance(item, Future):
+                if not wait and not item.done():
+                    return
+                item = _ocr_body(item.result())
+            del pending[next_page]
+            writer.write_page(next_page, item)
+            next_page += 1
+
+    try:
+        # Scanned pages are rendered in-process by pdfium, so there is no poppler process
+        # and no re-parse of the whole PDF per page
+        with ProcessPoolExecutor(max_workers=ocr_workers, initializer=_init_ocr_worker,
+                                 initargs=(pdf_path,)) as ocr_pool:
+            with pdfplumber.open(pdf_path) as pdf:
+                for page_number, page in enumerate(pdf.pages[first_page - 1:], start=first_page):
+                    extracted_text = page.extract_text()
+                    page.close()  # Release the page's parsed objects
+
+                    if extracted_text and extracted_text.strip():
+                        # If text is found, store it as is
+                        pending[page_number] = extracted_text.strip() + "\n"
+                    else:
+                        # If no text detected, queue the page for OCR and keep going
+                        pending[page_number] = ocr_pool.submit(ocr_page, page_number)
+                    write_ready_pages(wait=False)
+
+            # Wait for the remaining OCR results, writing them in page order
+            write_ready_pages(wait=True)
+        complete = True
+    finally:
+        writer.close(complete)
+
+def find_pdfs(inputs, file_list=None):
+    """Collect PDF paths from files, directory trees (searched recursively) and an optional list file."""
+    paths = list(inputs)
+    if file_list:
+        with open(file_list, 'r', encoding='utf-8') as list_file:
+            paths.extend(line.strip() for line in list_file if line.strip())
+
+    pdf_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            for folder_path, subfolders, filenames in os.walk(path):
+                subfolders.sort()
+                pdf_paths.extend(os.path.join(folder_path, name) for name in sorted(filenames)
+                                 if name.lower().endswith('.pdf'))
+        elif os.path.isfile(path):
+            pdf_paths.append(path)
+        else:
+            print(f"Skipping missing path: {path}")
+    return pdf_paths
+
+
+def markdown_path_for(pdf_path):
+    base_name, _ = os.path.splitext(pdf_path)
+    return base_name + ".md"
+
+
+def is_up_to_date(pdf_path, md_path):
+    """A Markdown file is up to date if it is newer than the PDF and not a partial run."""
+    if not os.path.exists(md_path) or os.path.exists(md_path + '.progress'):
+        return False
+    return os.path.getmtime(md_path) >= os.path.getmtime(pdf_path)
+
+
+def count_pages(pdf_path):
+    """Read the page count without parsing page content (0 if the PDF can't be opened)."""
+    try:
+        pdf = pypdfium2.PdfDocument(pdf_path)
+        page_count = len(pdf)
+        pdf.close()
+        return page_count
+    except pypdfium2.PdfiumError:
+        return 0
+
+
+def _convert_document(pdf_path, md_path, ocr_workers):
+    """Batch worker: convert one document and report how it went."""
+    started = time.perf_counter()
+    try:
+        pdf_to_markdown(pdf_path, md_path, ocr_workers=ocr_workers)
+        return pdf_path, None, time.perf_counter() - started
+    except Exception as e:
+        return pdf_path, str(e), time.perf_counter() - started
+
+
+def batch_convert(pdf_paths, jobs=None, ocr_workers=None, force=False):
+    """
+    Convert many PDFs on a pool of `jobs` worker processes.
+
+    Documents are scheduled largest first so long documents don't end up last,
+    and PDFs whose Markdown is already up to date are skipped unless force is set.
     """
-    markdown_lines = []
+    jobs = jobs or os.cpu_count() or 1
+    # Share the cores between documents so OCR pools don't oversubscribe the machine
+    ocr_workers = ocr_workers or max(1, (os.cpu_count() or 1) // jobs)
+
+    todo = []
+    skipped = 0
+    for pdf_path in pdf_paths:
+        md_path = markdown_path_for(pdf_path)
+        if not force and is_up_to_date(pdf_path, md_path):
+            skipped += 1
+            continue
+        todo.append((count_pages(pdf_path), pdf_path, md_path))
+    todo.sort(key=lambda item: item[0], reverse=True)
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_number, page in enumerate(pdf.pages, start=1):
-            extracted_text = page.extract_text()
+    print(f"Converting {len(todo)} PDF(s) with {jobs} worker(s); {skipped} already up to date.")
+    started = time.perf_counter()
+    converted_pages = 0
+    failed = 0
+    pages_by_path = {pdf_path: page_count for page_count, pdf_path, _ in todo}
 
-            if extracted_text and extracted_text.strip():
-                # If text is found, store it as is
-                markdown_lines.append(f"## Page {page_number}\n")
-                markdown_lines.append(extracted_text.strip() + "\n")
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_convert_document, pdf_path, md_path, ocr_workers)
+                   for _, pdf_path, md_path in todo]
+        for done, future in enumerate(as_completed(futures), start=1):
+            pdf_path, error, seconds = future.result()
+            if error:
+                failed += 1
+                print(f"[{done}/{len(todo)}] FAILED {pdf_path}: {error}")
             else:
-                # If no text detected, use OCR
-                markdown_lines.append(f"## Page {page_number}\n")
-
-                # Convert page to image for OCR
-                images = convert_from_path(
-                    pdf_path, 
-                    dpi=300, 
-                    first_page=page_number, 
-                    last_page=page_number
-                )
-                if images:
-                    img = images[0]
-                    ocr_text = pytesseract.image_to_string(img)
-                    markdown_lines.append(ocr_text.strip() + "\n")
-                else:
-                    markdown_lines.append("[ERROR] Unable to convert PDF page to image.\n")
-    
-    # Write everything to the Markdown file
-    with open(md_path, 'w', encoding='utf-8') as md_file:
-        md_file.write("\n".join(markdown_lines))
+                converted_pages += pages_by_path[pdf_path]
+                print(f"[{done}/{len(todo)}] {pdf_path} ({pages_by_path[pdf_path]} pages, {seconds:.1f}s)")
+
+    elapsed = time.perf_counter() - started
+    rate = converted_pages / elapsed if elapsed > 0 else 0.0
+    print(f"\nBatch complete: {len(todo) - failed} converted, {skipped} skipped, {failed} failed.")
+    print(f"{converted_pages} pages in {elapsed:.1f}s ({rate:.2f} pages/sec)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert PDFs to Markdown, using OCR for scanned pages.")
+    parser.add_argument('inputs', nargs='*',
+                        help="A PDF to convert, or several PDFs/folders for batch mode (prompted if omitted)")
+    parser.add_argument('--file-list', default=None,
+                        help="Text file with one PDF or folder path per line (batch mode)")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="Documents converted at once in batch mode (default: one per CPU)")
+    parser.add_argument('--force', action='store_true',
+                        help="Batch mode: convert even if the .md file is newer than the PDF")
+    parser.add_argument('--ocr-workers', type=int, default=None,
+                        help="Processes running OCR on scanned pages (default: one per CPU, shared out in batch mode)")
+    parser.add_argument('--stdout', action='store_true',
+                        help="Stream the Markdown to stdout page by page instead of writing a .md file")
+    return parser.parse_args()
 
 def main():
-    pdf_path = input("Enter the full path to the PDF file: ").strip()
+    args = parse_args()
+
+    # Several inputs, a folder or a list file: non-interactive batch mode
+    if args.file_list or len(args.inputs) > 1 or (args.inputs and os.path.isdir(args.inputs[0])):
+        if args.stdout:
+            print("--stdout only works with a single PDF.")
+            return
+        batch_convert(find_pdfs(args.inputs, args.file_list), jobs=args.jobs,
+                      ocr_workers=args.ocr_workers, force=args.force)
+        return
+
+    # In stdout mode the Markdown goes to stdout, so status messages go to stderr
+    log_stream = sys.stderr if args.stdout else sys.stdout
+    pdf_path = args.inputs[0] if args.inputs else input("Enter the full path to the PDF file: ").strip()
     if not pdf_path or not os.path.isfile(pdf_path):
-        print("Invalid file path. Exiting...")
+        print("Invalid file path. Exiting...", file=log_stream)
         return
 
-    base_name, _ = os.path.splitext(pdf_path)
-    md_path = base_name + ".md"
+    md_path = '-' if args.stdout else markdown_path_for(pdf_path)
 
-    print(f"Converting '{pdf_path}' to Markdown...")
-    pdf_to_markdown(pdf_path, md_path)
-    print(f"Markdown file saved to '{md_path}'")
+    print(f"Converting '{pdf_path}' to Markdown...", file=log_stream)
+    pdf_to_markdown(pdf_path, md_path, ocr_workers=args.ocr_workers)
+    if not args.stdout:
+        print(f"Markdown file saved to '{md_path}'")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,15 +1,455 @@
+import os
+import re
 import json
+import time
+import hashlib
+import argparse
+import tempfile
+import functools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 # from datetime import datetime # Removed
 from pathlib import Path
-# import os # Removed import
 
-def process_json_file(filepath):
+# Files bigger than this are parsed incrementally instead of with json.load
+STREAM_THRESHOLD_BYTES = 32 * 1024 * 1024
+# JSONL lines are sent to the workers in batches of up to this many lines or bytes
+JSONL_BATCH_LINES = 1000
+JSONL_BATCH_BYTES = 8 * 1024 * 1024
+# Dedupe mode: system prompts at least this long are stored once in a shared file and linked
+DEDUPE_ROLES = ('SYSTEM', 'DEVELOPER')
+DEDUPE_MIN_BYTES = 256
+SETTING_KEYS = ['temperature', 'max_completion_tokens', 'top_p', 'frequency_penalty', 'presence_penalty']
+
+def format_header(model, source_data):
+    """Markdown lines for the title and model settings. source_data holds the settings keys."""
+    settings = {key: source_data.get(key, 'N/A') for key in SETTING_KEYS}
+    return [
+        f"# Conversation with {model}\n",
+        "## Model Settings",
+        f"- Temperature: {settings['temperature']}",
+        f"- Max Completion Tokens: {settings['max_completion_tokens']}",
+        f"- Top P: {settings['top_p']}",
+        f"- Frequency Penalty: {settings['frequency_penalty']}",
+        f"- Presence Penalty: {settings['presence_penalty']}\n",
+        "## Conversation\n"
+    ]
+
+def format_message(msg):
+    """Markdown lines for one message, with a clear role label."""
+    content = []
+    role = msg.get('role', 'unknown').upper()
+    # Handle different roles slightly differently for clarity
+    if role == "USER":
+        content.append(f"### 👤 USER")
+    elif role == "ASSISTANT":
+        content.append(f"### 🤖 ASSISTANT")
+    elif role == "SYSTEM":
+         content.append(f"### ⚙️ SYSTEM") # Handle SYSTEM role
+    else:
+        content.append(f"### {role}") # Fallback for other roles
+
+    # Get message content - could be string or list
+    msg_content = msg.get('content')
+
+    if isinstance(msg_content, str):
+        # If content is a simple string
+        if msg_content:
+            content.append(msg_content.strip()) # Append the string content
+    elif isinstance(msg_content, list):
+        # If content is a list of items (original assumption)
+        for item in msg_content:
+            item_type = item.get('type', '')
+            if item_type == 'text':
+                text = item.get('text', '')
+                if text:
+                    content.append(text.strip())
+            elif item_type.startswith('image'):
+                content.append("*[Image attached]*")
+    # Else: Handle other potential content types or ignore
+
+    content.append("\n---\n")  # Add separator between messages
+    if _deduper is not None:
+        content = _deduper.dedupe(role, content)
+    return content
+
+class MessageDeduper:
+    """
+    Per-process half of dedupe mode: replaces repeated long system prompts with
+    links to a shared reference file, keyed by a hash of the body. The first time
+    this process sees a body it stays inline; it is only moved to the shared file
+    (and linked) once it comes up again. Bodies the file already holds are linked
+    straight away. New bodies are collected for the main process, which owns the file.
+    """
+
+    def __init__(self, reference_file, known=()):
+        self.reference_file = Path(reference_file).resolve()
+        self.link_dir = None  # Folder of the Markdown file being rendered
+        self._link_paths = {}
+        self._seen = set()  # Bodies left inline once
+        self._reported = set(known)  # Bodies in the shared file, or on their way there
+        self._new_bodies = {}
+        self._linked = 0
+        self._linked_bytes = 0
+
+    def dedupe(self, role, lines):
+        """Return lines (label, body..., separator) with the body swapped for a link if it qualifies."""
+        body = '\n'.join(lines[1:-1])
+        size = len(body.encode('utf-8'))
+        if role not in DEDUPE_ROLES or size < DEDUPE_MIN_BYTES:
+            return lines
+        digest = hashlib.sha256(body.encode('utf-8')).hexdigest()[:16]
+        if digest not in self._reported:
+            if digest not in self._seen:
+                # First sighting: keep it inline, it may never repeat
+                self._seen.add(digest)
+                return lines
+            self._reported.add(digest)
+            self._new_bodies[digest] = (lines[0], body)
+        if self.link_dir not in self._link_paths:
+            self._link_paths[self.link_dir] = Path(os.path.relpath(self.reference_file, self.link_dir)).as_posix()
+        link = f"*[Repeated message: see [{digest}]({self._link_paths[self.link_dir]}#sha-{digest})]*"
+        self._linked += 1
+        self._linked_bytes += size - len(link)
+        return [lines[0], link, lines[-1]]
+
+    def take_report(self):
+        """Return (new bodies, bodies linked, bytes removed) since the last call."""
+        report = (self._new_bodies, self._linked, self._linked_bytes)
+        self._new_bodies = {}
+        self._linked = 0
+        self._linked_bytes = 0
+        return report
+
+class SharedMessageStore:
+    """
+    The shared reference file of dedupe mode, written only by the main process.
+    Each body is appended once under an anchor named after its hash; bodies from
+    earlier runs are kept, so links in older Markdown files stay valid.
+    """
+
+    ANCHOR = re.compile(r'<a id="sha-([0-9a-f]{16})"></a>')
+
+    def __init__(self, path):
+        self.path = Path(path).resolve()
+        self.known = set()
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    match = self.ANCHOR.match(line)
+                    if match:
+                        self.known.add(match.group(1))
+        self.file = open(self.path, 'a', encoding='utf-8')
+        if not self.known and self.file.tell() == 0:
+            self.file.write("# Shared Messages\n\nMessage bodies that appear in more than one conversation, stored once.\n")
+        self.linked = 0
+        self.linked_bytes = 0
+        self.stored = 0
+        self.stored_bytes = 0
+
+    def merge(self, report):
+        """Add a worker's report: append bodies not stored yet and count what was linked."""
+        new_bodies, linked, linked_bytes = report
+        self.linked += linked
+        self.linked_bytes += linked_bytes
+        for digest, (label, body) in new_bodies.items():
+            if digest in self.known:
+                continue
+            self.known.add(digest)
+            entry = f"\n<a id=\"sha-{digest}\"></a>\n\n{label} `{digest}`\n{body}\n\n---\n"
+            self.file.write(entry)
+            self.stored += 1
+            self.stored_bytes += len(entry.encode('utf-8'))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+        saved = self.linked_bytes - self.stored_bytes
+        print(f"\nDedupe: {self.linked} message(s) linked to {self.stored} new shared bodies in '{self.path}'.")
+        print(f"Bytes saved: {saved / 1e6:.2f} MB")
+
+# MessageDeduper of this process while dedupe mode is on
+_deduper = None
+
+def _init_deduper(reference_file, known=()):
+    """Turn dedupe mode on in this process (also used as the pool initializer)."""
+    global _deduper
+    _deduper = MessageDeduper(reference_file, known)
+
+def _take_dedupe_report():
+    return _deduper.take_report() if _deduper is not None else None
+
+class StreamingJSONReader:
+    """
+    Minimal pull parser for JSON too big to load at once.
+
+    The file is read in chunks. Objects and arrays are walked with iter_object()
+    and iter_array(), and every key/item they yield must be consumed with
+    read_value() or skip_value() before asking for the next one. skip_value()
+    scans past a value without building it, so huge strings (e.g. base64 images)
+    never end up in memory as a whole.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+    _STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.S)  # Up to the closing quote
+    _STRUCTURE = re.compile(r'[\[\]{}"]')
+    _SCALAR = re.compile(r'[^\s,\]}]*')
+
+    def __init__(self, file):
+        self.file = file
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Read the next chunk, dropping everything before self.pos. Returns False at end of file."""
+        chunk = '' if self.eof else self.file.read(self.CHUNK_SIZE)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return bool(chunk)
+
+    def _more(self, i):
+        """Fill the buffer while scanning at index i; returns i adjusted for the dropped text."""
+        shift = self.pos
+        if not self._fill():
+            raise ValueError("Unexpected end of JSON data")
+        return i - shift
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            self.pos = self._WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON data")
+
+    def _expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Malformed JSON: expected '{char}'")
+        self.pos += 1
+
+    def _scan_value(self, keep):
+        """
+        Find the end of the value starting at the next character. With keep, the
+        value stays in the buffer from self.pos; otherwise it is dropped as it is scanned.
+        """
+        first = self.peek()
+        i = self.pos
+        if first not in '{["':
+            # Number, true, false or null; it may continue in the next chunk
+            while True:
+                i = self._SCALAR.match(self.buffer, i).end()
+                if i < len(self.buffer) or self.eof:
+                    return i
+                if not keep:
+                    self.pos = i
+                shift = self.pos
+                self._fill()
+                i -= shift
+
+        depth = 0
+        in_string = first == '"'
+        if in_string:
+            i += 1
+        while True:
+            if in_string:
+                i = self._STRING_BODY.match(self.buffer, i).end()
+                if i < len(self.buffer) and self.buffer[i] == '"':
+                    i += 1
+                    in_string = False
+                    if depth == 0:
+                        return i
+                    continue
+            else:
+                match = self._STRUCTURE.search(self.buffer, i)
+                if match:
+                    i = match.end()
+                    char = match.group()
+                    if char == '"':
+                        in_string = True
+                    elif char in '[{':
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if depth == 0:
+                            return i
+                    continue
+                i = len(self.buffer)
+            # Ran out of buffer inside the value
+            if not keep:
+                self.pos = i
+            i = self._more(i)
+
+    def read_value(self):
+        """Parse the next value completely and return it."""
+        end = self._scan_value(keep=True)
+        value = json.loads(self.buffer[self.pos:end])
+        self.pos = end
+        return value
+
+    def skip_value(self):
+        """Move past the next value without building it."""
+        self.pos = self._scan_value(keep=False)
+
+    def iter_object(self):
+        """Yield the keys of the object at the current position."""
+        self._expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise ValueError("Malformed JSON: expected an object key")
+            key = self.read_value()
+            self._expect(':')
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError("Malformed JSON: expected ',' or '}'")
+
+    def iter_array(self):
+        """Yield once for each item of the array at the current position."""
+        self._expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError("Malformed JSON: expected ',' or ']'")
+
+def _read_message(reader):
+    """Read one message, keeping only what the Markdown needs. Image parts are skipped unread."""
+    msg = {}
+    for key in reader.iter_object():
+        if key == 'content' and reader.peek() == '[':
+            parts = []
+            for _ in reader.iter_array():
+                if reader.peek() != '{':
+                    parts.append(reader.read_value())
+                    continue
+                part = {}
+                for part_key in reader.iter_object():
+                    if part_key in ('type', 'text'):
+                        part[part_key] = reader.read_value()
+                    else:
+                        reader.skip_value()
+                parts.append(part)
+            msg['content'] = parts
+        elif key in ('role', 'content'):
+            msg[key] = reader.read_value()
+        else:
+            reader.skip_value()
+    return msg
+
+def _stream_messages(reader, body):
+    """Write each message of the array at the reader's position to body as soon as it is read."""
+    if reader.peek() != '[':
+        raise ValueError("'messages' is not a list")
+    for _ in reader.iter_array():
+        if reader.peek() != '{':
+            raise ValueError("A message is not a JSON object")
+        body.write('\n' + '\n'.join(format_message(_read_message(reader))))
+
+def _stream_json_file(filepath, output_file):
+    """
+    Convert a conversation file without loading it whole. Messages are rendered
+    into temporary files as they are parsed, because the model and settings may
+    come after them in the file; the header and messages are then joined into the .md.
+    """
+    top_level = {}
+    payload = None
+    bodies = {}  # 'top' / 'payload' -> temporary file with that messages list rendered
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            reader = StreamingJSONReader(f)
+            if reader.peek() != '{':
+                raise ValueError("The file does not contain a JSON object")
+            for key in reader.iter_object():
+                if key == 'messages':
+                    bodies['top'] = tempfile.TemporaryFile('w+', encoding='utf-8')
+                    _stream_messages(reader, bodies['top'])
+                elif key == 'payload' and reader.peek() == '{':
+                    payload = {}
+                    for payload_key in reader.iter_object():
+                        if payload_key == 'messages':
+                            bodies['payload'] = tempfile.TemporaryFile('w+', encoding='utf-8')
+                            _stream_messages(reader, bodies['payload'])
+                        elif payload_key == 'model' or payload_key in SETTING_KEYS:
+                            payload[payload_key] = reader.read_value()
+                        else:
+                            reader.skip_value()
+                elif key == 'model' or key in SETTING_KEYS:
+                    top_level[key] = reader.read_value()
+                else:
+                    reader.skip_value()
+
+        # Same rules as the json.load path: a 'payload' object wins over top-level settings and messages
+        if payload is not None:
+            model = top_level.get('model', payload.get('model', 'Unknown Model'))
+            header = format_header(model, payload)
+            body = bodies.get('payload')
+        else:
+            header = format_header(top_level.get('model', 'Unknown Model'), top_level)
+            body = bodies.get('top')
+
+        # Write next to the output and rename, so a half-written .md never looks up to date
+        partial_file = output_file.with_name(output_file.name + '.partial')
+        with open(partial_file, 'w', encoding='utf-8') as out:
+            out.write('\n'.join(header))
+            if body is not None:
+                body.seek(0)
+                while True:
+                    chunk = body.read(StreamingJSONReader.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+        os.replace(partial_file, output_file)
+    finally:
+        for body in bodies.values():
+            body.close()
+
+def process_json_file(filepath, verbose=True, stream=None):
+    """
+    Convert one conversation .json file to a .md file next to it.
+    Large files (or any file with stream=True) are parsed incrementally.
+    """
     # Ensure filepath is a Path object
     filepath = Path(filepath)
+    # Generate output filename using source filename (same directory)
+    output_file = filepath.with_suffix(".md")
+
+    if _deduper is not None:
+        _deduper.link_dir = output_file.parent
+    if stream is None:
+        stream = filepath.stat().st_size > STREAM_THRESHOLD_BYTES
+    if stream:
+        _stream_json_file(filepath, output_file)
+        if verbose:
+            print(f"Processed '{filepath.name}' and saved to: {output_file.name}")
+        return
+
     # Read JSON file with UTF-8 encoding
     with open(filepath, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
+    # Save content with UTF-8 encoding
+    output_file.write_text(render_conversation(data), encoding='utf-8')
+    if verbose:
+        print(f"Processed '{filepath.name}' and saved to: {output_file.name}")
+
+def render_conversation(data):
+    """Return the Markdown for one conversation object (flat, or nested in 'payload')."""
     # Check for nested 'payload' structure first
     payload = data.get('payload')
     if isinstance(payload, dict):
@@ -17,119 +457,270 @@ def process_json_file(filepath):
         source_data = payload
         # Model might still be at the top level or within payload
         model = data.get('model', source_data.get('model', 'Unknown Model'))
-        # Settings are likely within payload
-        settings = {
-            'temperature': source_data.get('temperature', 'N/A'),
-            'max_completion_tokens': source_data.get('max_completion_tokens', 'N/A'),
-            'top_p': source_data.get('top_p', 'N/A'),
-            'frequency_penalty': source_data.get('frequency_penalty', 'N/A'),
-            'presence_penalty': source_data.get('presence_penalty', 'N/A')
-        }
-        messages = source_data.get('messages', [])
     else:
         # Fallback to top-level structure (original assumption)
         source_data = data
         model = source_data.get('model', 'Unknown Model')
-        settings = {
-            'temperature': source_data.get('temperature', 'N/A'),
-            'max_completion_tokens': source_data.get('max_completion_tokens', 'N/A'),
-            'top_p': source_data.get('top_p', 'N/A'),
-            'frequency_penalty': source_data.get('frequency_penalty', 'N/A'),
-            'presence_penalty': source_data.get('presence_penalty', 'N/A')
-        }
-        messages = source_data.get('messages', [])
+    messages = source_data.get('messages', [])
 
     # Format the content
-    content = [
-        f"# Conversation with {model}\n",
-        "## Model Settings",
-        f"- Temperature: {settings['temperature']}",
-        f"- Max Completion Tokens: {settings['max_completion_tokens']}",
-        f"- Top P: {settings['top_p']}",
-        f"- Frequency Penalty: {settings['frequency_penalty']}",
-        f"- Presence Penalty: {settings['presence_penalty']}\n",
-        "## Conversation\n"
-    ]
+    content = format_header(model, source_data)
 
     # Process messages with clear role labels
     for msg in messages:
-        role = msg.get('role', 'unknown').upper()
-        # Handle different roles slightly differently for clarity
-        if role == "USER":
-            content.append(f"### 👤 USER")
-        elif role == "ASSISTANT":
-            content.append(f"### 🤖 ASSISTANT")
-        elif role == "SYSTEM":
-             content.append(f"### ⚙️ SYSTEM") # Handle SYSTEM role
-        else:
-            content.append(f"### {role}") # Fallback for other roles
-
-        # Get message content - could be string or list
-        msg_content = msg.get('content')
-
-        if isinstance(msg_content, str):
-            # If content is a simple string
-            if msg_content:
-                content.append(msg_content.strip()) # Append the string content
-        elif isinstance(msg_content, list):
-            # If content is a list of items (original assumption)
-            for item in msg_content:
-                item_type = item.get('type', '')
-                if item_type == 'text':
-                    text = item.get('text', '')
-                    if text:
-                        content.append(text.strip())
-                elif item_type.startswith('image'):
-                    content.append("*[Image attached]*")
-        # Else: Handle other potential content types or ignore
-
-        content.append("\n---\n")  # Add separator between messages
+        content.extend(format_message(msg))
 
-    # Generate output filename using source filename (same directory)
-    output_file = filepath.with_suffix(".md")
+    return '\n'.join(content)
 
-    # Save content with UTF-8 encoding
-    output_file.write_text('\n'.join(content), encoding='utf-8')
-    print(f"Processed '{filepath.name}' and saved to: {output_file.name}")
+def find_json_files(paths, recursive=True):
+    """Collect .json and .jsonl files from the given files and folders (folders are searched recursively unless told not to)."""
+    json_files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            if not recursive:
+                json_files.extend(sorted(child for child in path.iterdir()
+                                         if child.suffix.lower() in ('.json', '.jsonl')))
+                continue
+            for folder, subfolders, filenames in os.walk(path):
+                subfolders.sort()
+                json_files.extend(Path(folder) / name for name in sorted(filenames)
+                                  if name.lower().endswith(('.json', '.jsonl')))
+        elif path.is_file():
+            json_files.append(path)
+        else:
+            print(f"Skipping missing path: {path}")
+    return json_files
 
-if __name__ == "__main__":
-    # Get the directory where the script is located or CWD as fallback
+def is_up_to_date(json_filepath, md_filepath):
+    """A Markdown file only counts as converted if it is at least as new as its JSON file."""
+    try:
+        return md_filepath.stat().st_mtime >= json_filepath.stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+def _convert_file(json_filepath, stream=None):
+    """Batch worker: convert one file and report (path, error, bytes read, dedupe report)."""
     try:
-        script_dir = Path(__file__).parent.resolve() # Use resolve() for absolute path
-    except NameError:
-        script_dir = Path('.').resolve()
-        print(f"Warning: Could not determine script's absolute directory, using current working directory: {script_dir}")
+        process_json_file(json_filepath, verbose=False, stream=stream)
+        return json_filepath, None, json_filepath.stat().st_size, _take_dedupe_report()
+    except Exception as e:
+        return json_filepath, str(e), 0, _take_dedupe_report()
 
-    print(f"Scanning for JSON files in: {script_dir}")
-    # Find all JSON files in the script's directory
-    json_files = list(script_dir.glob('*.json'))
+def batch_convert(json_files, jobs=None, force=False, stream=None, store=None):
+    """
+    Convert JSON files to Markdown on a pool of `jobs` processes (serially for jobs=1).
+    Files whose .md is newer than the .json are skipped unless force is set.
+    stream is passed to process_json_file (None: stream only large files).
+    With a SharedMessageStore, long system prompts are deduplicated into it.
+    """
+    convert = functools.partial(_convert_file, stream=stream)
+    jobs = jobs or os.cpu_count() or 1
+    todo = [path for path in json_files if force or not is_up_to_date(path, path.with_suffix('.md'))]
+    skipped_count = len(json_files) - len(todo)
+    print(f"Found {len(json_files)} JSON file(s); {skipped_count} already up to date. "
+          f"Converting {len(todo)} with {jobs} worker(s)...")
 
-    if not json_files:
-        print("No JSON files found in the directory.")
+    started = time.perf_counter()
+    converted_count = 0
+    failed_count = 0
+    bytes_read = 0
+    if jobs > 1 and len(todo) > 1:
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_deduper if store else None,
+                                   initargs=(store.path, frozenset(store.known)) if store else ())
+        # Hand files out in batches so small files don't cost one round trip each
+        results = pool.map(convert, todo, chunksize=max(1, min(256, len(todo) // (jobs * 4))))
     else:
-        print(f"Found {len(json_files)} JSON file(s). Checking for corresponding Markdown files...")
+        pool = None
+        if store:
+            _init_deduper(store.path, store.known)
+        results = map(convert, todo)
+    try:
+        for done, (json_filepath, error, size, dedupe_report) in enumerate(results, start=1):
+            if dedupe_report:
+                store.merge(dedupe_report)
+            if error:
+                failed_count += 1
+                print(f"Error processing {json_filepath}: {error}")
+            else:
+                converted_count += 1
+                bytes_read += size
+            if done % 1000 == 0:
+                elapsed = time.perf_counter() - started
+                print(f"  {done}/{len(todo)} files ({done / elapsed:.0f} files/sec)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
-    converted_count = 0
-    skipped_count = 0
+    elapsed = time.perf_counter() - started
+    print(f"\nConversion process complete.")
+    print(f"Successfully converted {converted_count} JSON file(s), {failed_count} failed, {skipped_count} skipped.")
+    if elapsed > 0 and converted_count:
+        print(f"{converted_count / elapsed:.1f} files/sec, {bytes_read / elapsed / 1e6:.1f} MB/sec ({elapsed:.1f}s)")
 
-    for json_filepath in json_files:
-        # Construct the expected markdown filepath
-        md_filepath = json_filepath.with_suffix('.md')
+def jsonl_output_paths(jsonl_path, shards=1):
+    """
+    Markdown files for a JSONL file: '<name>.jsonl.md', or '<name>.jsonl-001-of-008.md' ... when sharded.
+    The '.jsonl' stays in the name so 'foo.jsonl' never writes over the 'foo.md' made from 'foo.json'.
+    """
+    if shards <= 1:
+        return [jsonl_path.with_name(jsonl_path.name + '.md')]
+    return [jsonl_path.with_name(f"{jsonl_path.name}-{shard:03d}-of-{shards:03d}.md") for shard in range(1, shards + 1)]
 
-        # Check if the markdown file already exists
-        if not md_filepath.exists():
-            print(f"Found '{json_filepath.name}'. Corresponding '.md' file missing. Converting...")
-            try:
-                process_json_file(json_filepath)
-                converted_count += 1
-            except Exception as e:
-                print(f"Error processing {json_filepath.name}: {e}")
-        else:
-            # Optional: print skipping message
-            # print(f"Skipping '{json_filepath.name}', corresponding markdown file '{md_filepath.name}' already exists.")
-            skipped_count += 1
+def _read_jsonl_batches(f):
+    """Yield lists of (line_number, line) from a JSONL file opened in binary mode, in bounded batches."""
+    batch = []
+    batch_bytes = 0
+    for line_number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        batch.append((line_number, line))
+        batch_bytes += len(line)
+        if len(batch) >= JSONL_BATCH_LINES or batch_bytes >= JSONL_BATCH_BYTES:
+            yield batch
+            batch = []
+            batch_bytes = 0
+    if batch:
+        yield batch
 
-    print(f"\nConversion process complete.")
-    print(f"Successfully converted {converted_count} new JSON file(s).")
-    if skipped_count > 0:
-      print(f"Skipped {skipped_count} JSON file(s) as corresponding Markdown files already exist.")
\ No newline at end of file
+def _render_jsonl_batch(batch, link_dir=None):
+    """
+    JSONL worker: render each line as a conversation. Returns a list of
+    (line_number, markdown, error) and the dedupe report.
+    """
+    if _deduper is not None:
+        _deduper.link_dir = link_dir
+    results = []
+    for line_number, line in batch:
+        try:
+            results.append((line_number, render_conversation(json.loads(line)), None))
+        except Exception as e:
+            results.append((line_number, None, str(e)))
+    return results, _take_dedupe_report()
+
+def convert_jsonl(jsonl_path, shards=1, jobs=None, store=None):
+    """
+    Convert a JSONL file with one conversation per line into Markdown.
+
+    Lines are read in batches and rendered on `jobs` worker processes, with at
+    most two batches per worker in flight so memory stays bounded however long
+    the file is. Conversations are dealt round-robin into `shards` files (one
+    concatenated file for shards=1), in line order within each file.
+    With a SharedMessageStore, long system prompts are deduplicated into it.
+    Returns (converted, failed).
+    """
+    jobs = jobs or os.cpu_count() or 1
+    output_paths = jsonl_output_paths(jsonl_path, shards)
+    partial_paths = [path.with_name(path.name + '.partial') for path in output_paths]
+    outputs = [open(path, 'w', encoding='utf-8') for path in partial_paths]
+    shard_counts = [0] * len(outputs)
+    converted = 0
+    failed = 0
+
+    def write_results(batch_result):
+        nonlocal converted, failed
+        results, dedupe_report = batch_result
+        if dedupe_report:
+            store.merge(dedupe_report)
+        for line_number, markdown, error in results:
+            if error:
+                failed += 1
+                if failed <= 10:
+                    print(f"Error in {jsonl_path.name} line {line_number}: {error}")
+                continue
+            shard = converted % len(outputs)
+            if shard_counts[shard]:
+                outputs[shard].write("\n\n")
+            outputs[shard].write(f"<!-- {jsonl_path.name} line {line_number} -->\n\n{markdown}")
+            shard_counts[shard] += 1
+            converted += 1
+
+    try:
+        with open(jsonl_path, 'rb') as f:
+            if jobs > 1:
+                with ProcessPoolExecutor(max_workers=jobs, initializer=_init_deduper if store else None,
+                                         initargs=(store.path, frozenset(store.known)) if store else ()) as pool:
+                    pending = deque()
+                    for batch in _read_jsonl_batches(f):
+                        pending.append(pool.submit(_render_jsonl_batch, batch, jsonl_path.parent.resolve()))
+                        while len(pending) > jobs * 2:
+                            write_results(pending.popleft().result())
+                    while pending:
+                        write_results(pending.popleft().result())
+            else:
+                if store:
+                    _init_deduper(store.path, store.known)
+                for batch in _read_jsonl_batches(f):
+                    write_results(_render_jsonl_batch(batch, jsonl_path.parent.resolve()))
+    finally:
+        for output in outputs:
+            output.close()
+
+    # Only complete files get their final names, so an interrupted run never looks up to date
+    for partial_path, output_path in zip(partial_paths, output_paths):
+        os.replace(partial_path, output_path)
+    if failed > 10:
+        print(f"... {failed - 10} more lines in {jsonl_path.name} could not be converted")
+    return converted, failed
+
+def batch_convert_jsonl(jsonl_files, shards=1, jobs=None, force=False, store=None):
+    """Convert JSONL files one after another, each spread across the worker processes."""
+    for jsonl_path in jsonl_files:
+        if not force and all(is_up_to_date(jsonl_path, path) for path in jsonl_output_paths(jsonl_path, shards)):
+            print(f"Skipping '{jsonl_path}': Markdown is up to date.")
+            continue
+        started = time.perf_counter()
+        converted, failed = convert_jsonl(jsonl_path, shards=shards, jobs=jobs, store=store)
+        elapsed = time.perf_counter() - started
+        rate = converted / elapsed if elapsed > 0 else 0.0
+        print(f"Converted {converted} conversation(s) from '{jsonl_path}' into {max(1, shards)} file(s), "
+              f"{failed} failed ({rate:.0f} conversations/sec, "
+              f"{jsonl_path.stat().st_size / elapsed / 1e6 if elapsed > 0 else 0:.1f} MB/sec)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert AI conversation JSON files to Markdown.")
+    parser.add_argument('inputs', nargs='*',
+                        help="JSON/JSONL files or folders (searched recursively). Default: the script's own folder")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="Worker processes converting files (default: one per CPU)")
+    parser.add_argument('--force', action='store_true',
+                        help="Convert even if the .md file is newer than the .json file")
+    parser.add_argument('--stream', action='store_true',
+                        help=f"Parse every file incrementally (default: only files over "
+                             f"{STREAM_THRESHOLD_BYTES // (1024 * 1024)} MB)")
+    parser.add_argument('--shards', type=int, default=1,
+                        help="Split each JSONL file's conversations across N Markdown files (default: 1 file)")
+    parser.add_argument('--dedupe', nargs='?', const='shared-messages.md', default=None, metavar='FILE',
+                        help="Store long system prompts once in FILE (default: shared-messages.md) "
+                             "and link to them from each conversation")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.inputs:
+        json_files = find_json_files(args.inputs)
+    else:
+        # Get the directory where the script is located or CWD as fallback
+        try:
+            script_dir = Path(__file__).parent.resolve() # Use resolve() for absolute path
+        except NameError:
+            script_dir = Path('.').resolve()
+            print(f"Warning: Could not determine script's absolute directory, using current working directory: {script_dir}")
+
+        print(f"Scanning for JSON files in: {script_dir}")
+        # Find all JSON files in the script's directory
+        json_files = find_json_files([script_dir], recursive=False)
+
+    # .jsonl files hold one conversation per line and are converted separately
+    jsonl_files = [path for path in json_files if path.suffix.lower() == '.jsonl']
+    json_files = [path for path in json_files if path.suffix.lower() != '.jsonl']
+
+    store = SharedMessageStore(args.dedupe) if args.dedupe else None
+    if not json_files and not jsonl_files:
+        print("No JSON files found.")
+    if json_files:
+        batch_convert(json_files, jobs=args.jobs, force=args.force, stream=args.stream or None, store=store)
+    if jsonl_files:
+        batch_convert_jsonl(jsonl_files, shards=args.shards, jobs=args.jobs, force=args.force, store=store)
+    if store:
+        store.close()
@@ -1,18 +1,116 @@
+import os
+import sys
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import argparse
 import requests
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from tabulate import tabulate
 import datetime
 
-def fetch_models():
-    """Fetches model data from the OpenRouter API."""
-    url = "https://openrouter.ai/api/v1/models"
+MODELS_URL = os.environ.get("OPENROUTER_MODELS_URL", "https://openrouter.ai/api/v1/models")
+CACHE_FILE = Path(__file__).resolve().parent / "openrouter-models-cache.json"
+CACHE_TTL_SECONDS = 300  # Serve the cached catalog without asking the server for this long
+TIMEOUT = (5, 30)  # Connect and read timeouts in seconds
+STORE_FILE = Path(__file__).resolve().parent / "openrouter-models.sqlite"
+HISTORY_FILE = Path(__file__).resolve().parent / "openrouter-models-history.sqlite"
+PER_MILLION_PRICES = ("prompt", "completion", "internal_reasoning")  # Shown per 1M tokens in diffs
+
+def make_session(retries=3, backoff=0.5):
+    """A pooled session that retries connection errors and 429/5xx responses with exponential backoff."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True
+    )
+    session = requests.Session()
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=4)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def load_cache(cache_file=CACHE_FILE):
+    """Return the cached response record, or None if there is no usable cache."""
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if "data" in cache else None
+    except (OSError, ValueError):
+        return None
+
+def save_cache(cache, cache_file=CACHE_FILE):
+    """Write the cache record atomically so a concurrent reader never sees half a file."""
+    tmp_file = Path(str(cache_file) + ".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp_file, cache_file)
+
+def fetch_models(url=MODELS_URL, cache_file=CACHE_FILE, ttl=CACHE_TTL_SECONDS, offline=False,
+                 session=None, timeout=TIMEOUT):
+    """
+    Fetches model data from the OpenRouter API, with a local cache.
+
+    A cached response younger than ttl seconds is returned without a request.
+    Older ones are revalidated with If-None-Match / If-Modified-Since, so an
+    unchanged catalog costs a 304 instead of a full download. offline=True only
+    reads the cache, and a stale cache is also used if the server can't be reached.
+    """
+    cache = load_cache(cache_file)
+    if cache is not None and cache.get("url") != url:
+        cache = None  # Cached response is for a different endpoint
+
+    if offline:
+        if cache is None:
+            print(f"Offline mode: no cached model data for {url} in {cache_file}")
+            return None
+        return cache["data"]
+
+    if cache is not None and time.time() - cache.get("fetched_at", 0) < ttl:
+        return cache["data"]
+
+    headers = {}
+    if cache is not None:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    session = session or make_session()
     try:
-        response = requests.get(url)
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cache is not None:
+            # Not modified: keep the cached body and restart the TTL
+            cache["fetched_at"] = time.time()
+            save_cache(cache, cache_file)
+            return cache["data"]
         response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        data = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"Error fetching models: {e}")
+        if cache is not None:
+            print("Using cached model data instead.")
+            return cache["data"]
         return None
 
+    try:
+        save_cache({
+            "url": url,
+            "fetched_at": time.time(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "data": data
+        }, cache_file)
+    except OSError as e:
+        print(f"Warning: could not write cache file: {e}")
+    return data
+
 def format_models_table(data):
     """Formats the model data into a human-readable table."""
     if not data or 'data' not in data:
@@ -77,6 +175,312 @@ def format_models_table(data):
 
     return tabulate(table_data, headers=headers, tablefmt="pipe")  # Use pipe format for readability
 
+# Typed columns of the local catalog store, in the order normalize_model returns them
+STORE_COLUMNS = [
+    ("id", "TEXT PRIMARY KEY"),
+    ("name", "TEXT"),
+    ("created", "INTEGER"),
+    ("context_length", "INTEGER"),
+    ("modality", "TEXT"),
+    ("input_modalities", "TEXT"),   # Stored as ",text,image," so one LIKE finds a modality
+    ("output_modalities", "TEXT"),
+    ("tokenizer", "TEXT"),
+    ("instruct_type", "TEXT"),
+    ("prompt_per_1m", "REAL"),      # USD per 1M tokens; NULL if unknown or variable
+    ("completion_per_1m", "REAL"),
+    ("request_price", "REAL"),
+    ("image_price", "REAL"),
+    ("web_search_price", "REAL"),
+    ("internal_reasoning_per_1m", "REAL"),
+    ("description", "TEXT"),
+]
+SORT_COLUMNS = {
+    "prompt": "prompt_per_1m",
+    "completion": "completion_per_1m",
+    "context": "context_length",
+    "created": "created",
+    "name": "name",
+}
+
+def _price(value, scale=1):
+    """Parse an OpenRouter price string; negative prices (variable pricing) count as unknown."""
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price * scale if price >= 0 else None
+
+def normalize_model(model):
+    """Flatten one model record into the typed STORE_COLUMNS values, in a single pass."""
+    architecture = model.get("architecture") or {}
+    pricing = model.get("pricing") or {}
+    input_modalities = architecture.get("input_modalities") or []
+    output_modalities = architecture.get("output_modalities") or []
+    return (
+        model["id"],
+        model.get("name"),
+        model.get("created"),
+        model.get("context_length"),
+        architecture.get("modality"),
+        "," + ",".join(input_modalities) + "," if input_modalities else None,
+        "," + ",".join(output_modalities) + "," if output_modalities else None,
+        architecture.get("tokenizer"),
+        architecture.get("instruct_type"),
+        _price(pricing.get("prompt"), 1000000),
+        _price(pricing.get("completion"), 1000000),
+        _price(pricing.get("request")),
+        _price(pricing.get("image")),
+        _price(pricing.get("web_search")),
+        _price(pricing.get("internal_reasoning"), 1000000),
+        model.get("description"),
+    )
+
+def catalog_hash(data):
+    """Content hash of a catalog response, independent of key order."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+def open_store(data, store_file=STORE_FILE):
+    """
+    Open the SQLite catalog store, reloading it first if the catalog changed
+    since it was built. Returns the connection.
+    """
+    conn = sqlite3.connect(store_file)
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("CREATE TABLE IF NOT EXISTS models ("
+                 + ", ".join(f"{name} {kind}" for name, kind in STORE_COLUMNS) + ")")
+    conn.execute("CREATE INDEX IF NOT EXISTS models_prompt ON models (prompt_per_1m)")
+    conn.execute("CREATE INDEX IF NOT EXISTS models_context ON models (context_length)")
+
+    current = catalog_hash(data)
+    row = conn.execute("SELECT value FROM meta WHERE key = 'catalog_hash'").fetchone()
+    if row is None or row[0] != current:
+        with conn:
+            conn.execute("DELETE FROM models")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO models VALUES ({', '.join('?' * len(STORE_COLUMNS))})",
+                (normalize_model(model) for model in data.get("data", []) if "id" in model)
+            )
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('catalog_hash', ?)", (current,))
+    return conn
+
+def query_models(conn, input_modalities=(), output_modalities=(), min_context=None, max_prompt_price=None,
+                 max_completion_price=None, search=None, sort="prompt", descending=False, limit=20):
+    """Filter and sort the stored catalog. Prices are USD per 1M tokens. Returns a list of dict rows."""
+    where = []
+    params = []
+    for modality in input_modalities:
+        where.append("input_modalities LIKE ?")
+        params.append(f"%,{modality},%")
+    for modality in output_modalities:
+        where.append("output_modalities LIKE ?")
+        params.append(f"%,{modality},%")
+    if min_context is not None:
+        where.append("context_length >= ?")
+        params.append(min_context)
+    if max_prompt_price is not None:
+        where.append("prompt_per_1m <= ?")
+        params.append(max_prompt_price)
+    if max_completion_price is not None:
+        where.append("completion_per_1m <= ?")
+        params.append(max_completion_price)
+    if search:
+        where.append("(id LIKE ? OR name LIKE ?)")
+        params.extend([f"%{search}%"] * 2)
+
+    column = SORT_COLUMNS[sort]
+    sql = "SELECT * FROM models"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    # Unknown values always sort last
+    sql += f" ORDER BY {column} IS NULL, {column} {'DESC' if descending else 'ASC'}, id"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    conn.row_factory = sqlite3.Row
+    return [dict(row) for row in conn.execute(sql, params)]
+
+def format_query_results(rows, output_format="table"):
+    """Render query results as a table, CSV or JSON."""
+    if output_format == "json":
+        for row in rows:
+            for key in ("input_modalities", "output_modalities"):
+                row[key] = row[key].strip(",").split(",") if row[key] else []
+        return json.dumps(rows, indent=2)
+
+    headers = ["ID", "Context Length", "Input Modalities", "Prompt $/1M", "Completion $/1M", "Name"]
+    table_data = [[
+        row["id"],
+        row["context_length"],
+        (row["input_modalities"] or "").strip(",").replace(",", ", ") or "N/A",
+        f"{row['prompt_per_1m']:.2f}" if row["prompt_per_1m"] is not None else "N/A",
+        f"{row['completion_per_1m']:.2f}" if row["completion_per_1m"] is not None else "N/A",
+        row["name"],
+    ] for row in rows]
+    if output_format == "csv":
+        import csv
+        import io
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(headers)
+        writer.writerows(table_data)
+        return buffer.getvalue()
+    if not rows:
+        return "No models match."
+    return tabulate(table_data, headers=headers, tablefmt="pipe", disable_numparse=True)
+
+def parse_count(text):
+    """Parse a token count like 128000, 128k or 1m (k = 1000)."""
+    text = text.strip().lower()
+    multiplier = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    try:
+        return int(float(text.rstrip("km")) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid token count: {text}")
+
+def _record_hash(model):
+    return hashlib.sha256(json.dumps(model, sort_keys=True).encode("utf-8")).hexdigest()
+
+def open_history(history_file=HISTORY_FILE):
+    """
+    Open the snapshot history. Model records are stored once per distinct
+    content (zlib-compressed JSON keyed by hash), and each snapshot only lists
+    the models whose record changed since the previous one (NULL = removed).
+    """
+    conn = sqlite3.connect(history_file)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS records (hash TEXT PRIMARY KEY, body BLOB);
+        CREATE TABLE IF NOT EXISTS snapshots (
+            id INTEGER PRIMARY KEY, taken_at TEXT, catalog_hash TEXT, model_count INTEGER);
+        CREATE TABLE IF NOT EXISTS changes (
+            snapshot_id INTEGER, model_id TEXT, record_hash TEXT, PRIMARY KEY (model_id, snapshot_id));
+        CREATE INDEX IF NOT EXISTS changes_snapshot ON changes (snapshot_id);
+        CREATE TABLE IF NOT EXISTS latest (model_id TEXT PRIMARY KEY, record_hash TEXT);
+    """)
+    return conn
+
+def record_snapshot(conn, data):
+    """
+    Store the catalog as a delta against the latest snapshot.
+    Returns the new snapshot ID, or None if nothing changed.
+    """
+    current = catalog_hash(data)
+    last = conn.execute("SELECT catalog_hash FROM snapshots ORDER BY id DESC LIMIT 1").fetchone()
+    if last is not None and last[0] == current:
+        return None  # Identical catalog: no per-model work at all
+
+    models = {model["id"]: model for model in data.get("data", []) if "id" in model}
+    hashes = {model_id: _record_hash(model) for model_id, model in models.items()}
+    latest = dict(conn.execute("SELECT model_id, record_hash FROM latest"))
+    changed = {model_id: record_hash for model_id, record_hash in hashes.items() if latest.get(model_id) != record_hash}
+    removed = [model_id for model_id in latest if model_id not in hashes]
+
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO snapshots (taken_at, catalog_hash, model_count) VALUES (?, ?, ?)",
+            (datetime.datetime.now().isoformat(timespec="seconds"), current, len(models))
+        )
+        snapshot_id = cursor.lastrowid
+        conn.executemany(
+            "INSERT OR IGNORE INTO records VALUES (?, ?)",
+            ((record_hash, zlib.compress(json.dumps(models[model_id], sort_keys=True).encode("utf-8")))
+             for model_id, record_hash in changed.items())
+        )
+        conn.executemany(
+            "INSERT INTO changes VALUES (?, ?, ?)",
+            [(snapshot_id, model_id, record_hash) for model_id, record_hash in changed.items()]
+            + [(snapshot_id, model_id, None) for model_id in removed]
+        )
+        conn.executemany("INSERT OR REPLACE INTO latest VALUES (?, ?)", changed.items())
+        conn.executemany("DELETE FROM latest WHERE model_id = ?", [(model_id,) for model_id in removed])
+    return snapshot_id
+
+def _record_at(conn, model_id, snapshot_id):
+    """The model's record as of a snapshot, or None if it wasn't in the catalog then."""
+    row = conn.execute(
+        "SELECT r.body FROM changes c LEFT JOIN records r ON r.hash = c.record_hash "
+        "WHERE c.model_id = ? AND c.snapshot_id <= ? ORDER BY c.snapshot_id DESC LIMIT 1",
+        (model_id, snapshot_id)
+    ).fetchone()
+    return json.loads(zlib.decompress(row[0])) if row and row[0] is not None else None
+
+def diff_snapshots(conn, from_id, to_id):
+    """
+    Compare two snapshots. Only models with a change recorded between them are
+    looked at, so the cost follows the number of changes, not the catalog size.
+    """
+    model_ids = [row[0] for row in conn.execute(
+        "SELECT DISTINCT model_id FROM changes WHERE snapshot_id > ? AND snapshot_id <= ? ORDER BY model_id",
+        (from_id, to_id)
+    )]
+    diff = {"added": [], "removed": [], "price_changes": [], "other_changes": []}
+    for model_id in model_ids:
+        before = _record_at(conn, model_id, from_id)
+        after = _record_at(conn, model_id, to_id)
+        if before == after:
+            continue  # Changed and changed back
+        if before is None:
+            diff["added"].append(after)
+        elif after is None:
+            diff["removed"].append(before)
+        else:
+            old_pricing = before.get("pricing") or {}
+            new_pricing = after.get("pricing") or {}
+            prices = [(key, old_pricing.get(key), new_pricing.get(key))
+                      for key in sorted(set(old_pricing) | set(new_pricing))
+                      if old_pricing.get(key) != new_pricing.get(key)]
+            if prices:
+                diff["price_changes"].append((model_id, prices))
+            fields = sorted(key for key in set(before) | set(after)
+                            if key != "pricing" and before.get(key) != after.get(key))
+            if fields:
+                diff["other_changes"].append((model_id, fields))
+    return diff
+
+def _format_price(key, value):
+    scale = 1000000 if key in PER_MILLION_PRICES else 1
+    price = _price(value, scale)
+    if price is None:
+        return "N/A" if value is None else str(value)
+    return f"${price:.2f}/1M" if scale > 1 else f"${price:g}"
+
+def format_diff(diff, from_id, to_id):
+    """Human-readable report of a diff_snapshots result."""
+    lines = [f"Changes from snapshot {from_id} to {to_id}:"]
+    if not any(diff.values()):
+        return lines[0] + " none"
+    if diff["added"]:
+        lines.append(f"\nAdded ({len(diff['added'])}):")
+        for model in diff["added"]:
+            pricing = model.get("pricing") or {}
+            lines.append(f"  + {model['id']} ({model.get('name', '')}) prompt {_format_price('prompt', pricing.get('prompt'))}, "
+                         f"completion {_format_price('completion', pricing.get('completion'))}")
+    if diff["removed"]:
+        lines.append(f"\nRemoved ({len(diff['removed'])}):")
+        for model in diff["removed"]:
+            lines.append(f"  - {model['id']} ({model.get('name', '')})")
+    if diff["price_changes"]:
+        lines.append(f"\nPrice changes ({len(diff['price_changes'])}):")
+        for model_id, prices in diff["price_changes"]:
+            changes = ", ".join(f"{key} {_format_price(key, old)} -> {_format_price(key, new)}"
+                                for key, old, new in prices)
+            lines.append(f"  * {model_id}: {changes}")
+    if diff["other_changes"]:
+        lines.append(f"\nOther changes ({len(diff['other_changes'])}):")
+        for model_id, fields in diff["other_changes"]:
+            lines.append(f"  ~ {model_id}: {', '.join(fields)}")
+    return "\n".join(lines)
+
+def format_history(conn):
+    """Table of stored snapshots with the number of model changes in each."""
+    rows = conn.execute(
+        "SELECT s.id, s.taken_at, s.model_count, COUNT(c.model_id) FROM snapshots s "
+        "LEFT JOIN changes c ON c.snapshot_id = s.id GROUP BY s.id ORDER BY s.id"
+    ).fetchall()
+    if not rows:
+        return "No snapshots yet. Run the 'snapshot' command first."
+    return tabulate(rows, headers=["Snapshot", "Taken At", "Models", "Changed Models"], tablefmt="pipe")
+
 def save_table_to_file(table_string):
     """Saves the formatted table string to a file with a timestamp in the filename."""
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -88,8 +492,103 @@ def save_table_to_file(table_string):
     except IOError as e:
         print(f"Error saving to file: {e}")
 
+def parse_args(argv=None):
+    # Fetch options are shared by every command
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--url", default=MODELS_URL,
+                        help="Models endpoint (default: OpenRouter, or $OPENROUTER_MODELS_URL)")
+    common.add_argument("--cache-file", type=Path, default=CACHE_FILE,
+                        help="Where the last response is cached (default: next to this script)")
+    common.add_argument("--ttl", type=float, default=CACHE_TTL_SECONDS,
+                        help=f"Seconds a cached catalog is used without contacting the server (default: {CACHE_TTL_SECONDS})")
+    common.add_argument("--refresh", action="store_true",
+                        help="Ignore the TTL and revalidate the cache with the server now")
+    common.add_argument("--offline", action="store_true", help="Only use the cached catalog; no network access")
+    common.add_argument("--timeout", type=float, default=TIMEOUT[1],
+                        help=f"Read timeout in seconds (default: {TIMEOUT[1]})")
+    common.add_argument("--retries", type=int, default=3, help="Retries for failed requests (default: 3)")
+
+    parser = argparse.ArgumentParser(description="Fetch the OpenRouter model catalog and save or query it.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("table", parents=[common],
+                        help="Save the whole catalog as a timestamped table (default)")
+    query = commands.add_parser("query", parents=[common], help="Filter and sort the catalog")
+    query.add_argument("--modality", action="append", default=[], metavar="NAME",
+                       help="Required input modality, e.g. image (repeatable)")
+    query.add_argument("--output-modality", action="append", default=[], metavar="NAME",
+                       help="Required output modality (repeatable)")
+    query.add_argument("--min-context", type=parse_count, default=None,
+                       help="Minimum context length, e.g. 128k (k = 1000)")
+    query.add_argument("--max-prompt-price", type=float, default=None, help="Max prompt price, USD per 1M tokens")
+    query.add_argument("--max-completion-price", type=float, default=None,
+                       help="Max completion price, USD per 1M tokens")
+    query.add_argument("--search", default=None, help="Text to find in the model ID or name")
+    query.add_argument("--sort", choices=list(SORT_COLUMNS), default="prompt", help="Sort key (default: prompt)")
+    query.add_argument("--desc", action="store_true", help="Sort in descending order")
+    query.add_argument("--limit", type=int, default=20, help="Max rows to show, 0 for all (default: 20)")
+    query.add_argument("--format", choices=["table", "csv", "json"], default="table", help="Output format")
+    query.add_argument("--store-file", type=Path, default=STORE_FILE,
+                       help="SQLite catalog store (default: next to this script)")
+
+    snapshot = commands.add_parser("snapshot", parents=[common],
+                                   help="Record the catalog in the history if it changed, and show the changes")
+    diff = commands.add_parser("diff", help="Show added/removed models and price changes between snapshots")
+    diff.add_argument("from_id", nargs="?", type=int, default=None,
+                      help="Older snapshot (default: the one before the newest)")
+    diff.add_argument("to_id", nargs="?", type=int, default=None, help="Newer snapshot (default: the newest)")
+    history = commands.add_parser("history", help="List the recorded snapshots")
+    for command in (snapshot, diff, history):
+        command.add_argument("--history-file", type=Path, default=HISTORY_FILE,
+                             help="Snapshot history database (default: next to this script)")
+
+    argv = sys.argv[1:] if argv is None else argv
+    # Without a command, behave like before and save the table
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv = ["table"] + argv
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    model_data = fetch_models()
-    if model_data:
+    args = parse_args()
+    if args.command in ("diff", "history"):
+        # These only read the stored history, no fetch needed
+        conn = open_history(args.history_file)
+        if args.command == "history":
+            print(format_history(conn))
+        else:
+            snapshot_ids = [row[0] for row in conn.execute("SELECT id FROM snapshots ORDER BY id")]
+            to_id = args.to_id if args.to_id is not None else (snapshot_ids[-1] if snapshot_ids else None)
+            older = [snapshot_id for snapshot_id in snapshot_ids if to_id is not None and snapshot_id < to_id]
+            from_id = args.from_id if args.from_id is not None else (older[-1] if older else None)
+            if from_id is None or to_id is None:
+                print("Need at least two snapshots to diff. Run the 'snapshot' command again later.")
+            else:
+                print(format_diff(diff_snapshots(conn, from_id, to_id), from_id, to_id))
+        conn.close()
+        sys.exit(0)
+
+    model_data = fetch_models(url=args.url, cache_file=args.cache_file, ttl=0 if args.refresh else args.ttl,
+                              offline=args.offline, session=make_session(retries=args.retries),
+                              timeout=(TIMEOUT[0], args.timeout))
+    if model_data and args.command == "query":
+        conn = open_store(model_data, args.store_file)
+        rows = query_models(conn, input_modalities=args.modality, output_modalities=args.output_modality,
+                            min_context=args.min_context, max_prompt_price=args.max_prompt_price,
+                            max_completion_price=args.max_completion_price, search=args.search,
+                            sort=args.sort, descending=args.desc, limit=args.limit)
+        conn.close()
+        print(format_query_results(rows, args.format))
+    elif model_data and args.command == "snapshot":
+        conn = open_history(args.history_file)
+        snapshot_id = record_snapshot(conn, model_data)
+        if snapshot_id is None:
+            print("Catalog unchanged since the last snapshot.")
+        else:
+            previous = conn.execute("SELECT MAX(id) FROM snapshots WHERE id < ?", (snapshot_id,)).fetchone()[0]
+            if previous is None:
+                print(f"Recorded first snapshot ({snapshot_id}) with {len(model_data.get('data', []))} models.")
+            else:
+                print(format_diff(diff_snapshots(conn, previous, snapshot_id), previous, snapshot_id))
+        conn.close()
+    elif model_data:
         table = format_models_table(model_data)
         save_table_to_file(table)
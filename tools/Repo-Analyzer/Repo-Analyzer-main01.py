@@ -1,18 +1,153 @@
 import os
 import glob
+import argparse
+import codecs
 import json
+import gzip
+import io
+import sqlite3
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 import git
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from fnmatch import fnmatch
+from gitignore_matcher import GitignoreMatcher
 import logging
 from datetime import datetime
 
+try:
+    import zstandard  # Optional: only needed for --compress zstd
+except ImportError:
+    zstandard = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class AnalysisCache:
+    """SQLite cache of per-file analysis results, keyed on path plus size/mtime or git blob SHA."""
+
+    def __init__(self, cache_file: Path, repo_path: Path):
+        self.cache_file = cache_file
+        self.conn = sqlite3.connect(str(cache_file))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, blob_sha TEXT, record TEXT)"
+        )
+        self.git_index = self._load_git_index(repo_path)
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+        self._pending_writes = 0
+
+    def _load_git_index(self, repo_path: Path) -> Dict[str, Tuple[str, int, int]]:
+        """Map tracked paths to (blob SHA, size, mtime seconds) from the git index."""
+        try:
+            repo = git.Repo(repo_path)
+            return {
+                path: (entry.hexsha, entry.size, entry.mtime[0])
+                for (path, stage), entry in repo.index.entries.items()
+                if stage == 0
+            }
+        except Exception as e:
+            logger.info(f"No git index available for cache lookups: {e}")
+            return {}
+
+    def _blob_sha(self, rel_path: str, stat: os.stat_result) -> Optional[str]:
+        """Return the git blob SHA if the working tree file still matches the index."""
+        entry = self.git_index.get(rel_path)
+        if entry and entry[1] == stat.st_size and entry[2] == int(stat.st_mtime):
+            return entry[0]
+        return None
+
+    def get(self, rel_path: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """Return the cached record for an unchanged file, or None."""
+        self.seen.add(rel_path)
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, blob_sha, record FROM files WHERE path = ?", (rel_path,)
+        ).fetchone()
+        if row:
+            size, mtime_ns, blob_sha, record = row
+            current_sha = self._blob_sha(rel_path, stat)
+            if size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+                self.hits += 1
+                if current_sha and current_sha != blob_sha:
+                    # Remember the blob SHA once the file is committed
+                    self.conn.execute("UPDATE files SET blob_sha = ? WHERE path = ?", (current_sha, rel_path))
+                return json.loads(record)
+            # A fresh checkout changes mtimes but not content, so fall back to the blob SHA
+            if current_sha and current_sha == blob_sha and size == stat.st_size:
+                self.hits += 1
+                cached = json.loads(record)
+                cached['last_modified'] = stat.st_mtime
+                self.put(rel_path, stat, cached)
+                return cached
+        self.misses += 1
+        return None
+
+    def put(self, rel_path: str, stat: os.stat_result, record: Dict[str, Any]) -> None:
+        """Store a freshly analyzed record. Errors are never cached."""
+        if 'error' in record:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, blob_sha, record) VALUES (?, ?, ?, ?, ?)",
+            (rel_path, stat.st_size, stat.st_mtime_ns, self._blob_sha(rel_path, stat), json.dumps(record))
+        )
+        self._pending_writes += 1
+        if self._pending_writes >= 1000:
+            self.conn.commit()
+            self._pending_writes = 0
+
+    def close(self, prune: bool = True) -> None:
+        """
+        Commit and close. With prune, entries for files the walk didn't see are
+        dropped first, so only pass it after a complete walk of the repository.
+        """
+        stale = []
+        if prune:
+            stale = [(path,) for (path,) in self.conn.execute("SELECT path FROM files")
+                     if path not in self.seen]
+            self.conn.executemany("DELETE FROM files WHERE path = ?", stale)
+        self.conn.commit()
+        self.conn.close()
+        logger.info(f"Analysis cache: {self.hits} unchanged, {self.misses} analyzed, {len(stale)} removed")
+
+class NDJSONExporter:
+    """Write analysis records one per line as files are analyzed, with a metadata footer."""
+
+    EXTENSIONS = {None: '.ndjson', 'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst'}
+
+    def __init__(self, output_stem: Path, compression: Optional[str] = None):
+        if compression not in self.EXTENSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.output_file = output_stem.with_name(output_stem.name + self.EXTENSIONS[compression])
+
+        if compression == 'gzip':
+            self.stream = gzip.open(self.output_file, 'wt', encoding='utf-8')
+        elif compression == 'zstd':
+            if zstandard is None:
+                raise ImportError("zstd compression requires the 'zstandard' package (pip install zstandard)")
+            raw = open(self.output_file, 'wb')
+            self.stream = io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw), encoding='utf-8')
+        else:
+            self.stream = open(self.output_file, 'w', encoding='utf-8')
+
+    def _write_line(self, record: Dict[str, Any]) -> None:
+        self.stream.write(json.dumps(record, separators=(',', ':')))
+        self.stream.write('\n')
+
+    def write_file(self, file_info: Dict[str, Any]) -> None:
+        """Write one analyzed file as a single line."""
+        self._write_line({'file': file_info})
+
+    def write_metadata(self, metadata: Dict[str, Any]) -> None:
+        """Write the metadata footer. The directory structure is left out since the file lines carry it."""
+        self._write_line({'metadata': {k: v for k, v in metadata.items() if k != 'directory_structure'}})
+
+    def close(self) -> None:
+        self.stream.close()
+
 class RepoAnalyzer:
 
     EXCLUDED_EXTENSIONS = {
@@ -52,8 +187,14 @@ class RepoAnalyzer:
         '__history',
         '__*'
     }
+
+    # Number of files handed to a worker process at a time
+    BATCH_SIZE = 64
+    
+    CACHE_FILENAME = 'analysis_cache.sqlite'
     
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, workers: int = 1, use_cache: bool = True,
+                 export_format: str = 'json', compression: Optional[str] = None):
         """Initialize the repository analyzer."""
         self.repo_path = Path(repo_path)
         self.output_path = self.repo_path / '__Repo-Analyzer-Output'  # Save directly in the repo path
@@ -62,29 +203,25 @@ class RepoAnalyzer:
         if not self.output_path.exists():
             self.output_path.mkdir(parents=True, exist_ok=True)  # Create the directory if it doesn't exist
         
+        self.workers = max(1, workers)
+        self.use_cache = use_cache
+        self.cache = None
+        self.export_format = export_format
+        self.compression = compression
+        self.exporter = None
         self.file_structure = defaultdict(dict)
         self.metadata = {}
-        self.gitignore_patterns = self._parse_gitignore()
+        self._walk_stats = {'dirs_scanned': 0, 'dirs_pending': 0, 'files_found': 0}
+        self.gitignore = GitignoreMatcher(str(self.repo_path))
 
-    def _parse_gitignore(self) -> List[str]:
-        """Parse .gitignore file and return patterns."""
-        gitignore_path = self.repo_path / '.gitignore'
-        patterns = []
-        if gitignore_path.exists():
-            try:
-                with open(gitignore_path, 'r') as f:
-                    patterns = [line.strip() for line in f 
-                              if line.strip() and not line.startswith('#')]
-            except Exception as e:
-                logger.warning(f"Error reading .gitignore: {e}")
-        return patterns
-
-    def _is_binary_file(self, file_path: Path) -> bool:
-        """Check if file is binary."""
+    def _is_binary_data(self, sample: bytes, complete: bool) -> bool:
+        """Check if the first 1KB of a file's bytes looks binary. complete says the sample is the whole file."""
+        if b'\0' in sample:
+            return True
         try:
-            with open(file_path, 'tr') as check_file:
-                check_file.read(1024)
-                return False
+            # A multi-byte character cut off at the 1KB mark is not an error
+            codecs.getincrementaldecoder('utf-8')().decode(sample, final=complete)
+            return False
         except UnicodeDecodeError:
             return True
 
@@ -111,6 +248,11 @@ class RepoAnalyzer:
                     logger.info(f"Skipping file {file_path} due to directory starting with '.' or '__': {part}")
                     return False
 
+            # Check .gitignore rules (including nested .gitignore files)
+            if self.gitignore.is_ignored(file_path.relative_to(self.repo_path).as_posix()):
+                logger.info(f"Skipping file {file_path} due to gitignore pattern match")
+                return False
+
             logger.info(f"Including file {file_path} for processing")
             return True
         except Exception as e:
@@ -133,29 +275,39 @@ class RepoAnalyzer:
     def analyze_file(self, file_path: Path) -> Dict[str, Any]:
         """Analyze individual file content and metadata."""
         try:
+            # Classify the file from its first 1KB; only text files are read in full,
+            # continuing from the same handle, so large binaries are never loaded
+            stat = os.stat(file_path)
+            with open(file_path, 'rb') as f:
+                data = f.read(1024)
+                rest = f.read(1)
+                is_binary = self._is_binary_data(data, complete=not rest)
+                if not is_binary and rest:
+                    data += rest + f.read()
+
             # Check if file is binary
-            if self._is_binary_file(file_path):
+            if is_binary:
                 return {
                     'path': str(file_path.relative_to(self.repo_path)),
-                    'size': os.path.getsize(file_path),
+                    'size': stat.st_size,
                     'extension': file_path.suffix,
                     'type': 'binary',
-                    'last_modified': os.path.getmtime(file_path)
+                    'last_modified': stat.st_mtime
                 }
 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Decode with universal newlines, matching a text-mode read
+            content = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
 
             # Scrub links or embeds to excluded file types
             content = self._scrub_excluded_links(content)
 
             return {
                 'path': str(file_path.relative_to(self.repo_path)),
-                'size': os.path.getsize(file_path),
+                'size': stat.st_size,
                 'extension': file_path.suffix,
                 'content': content,
                 'imports': self._extract_imports(content, file_path.suffix),
-                'last_modified': os.path.getmtime(file_path),
+                'last_modified': stat.st_mtime,
                 'type': 'text'
             }
         except UnicodeDecodeError:
@@ -189,39 +341,179 @@ class RepoAnalyzer:
             content = content.replace(f'https://example.com/file{ext}', '')  # Example link format
         return content
 
+    def _is_excluded_directory(self, name: str) -> bool:
+        """Check a single directory name against the excluded directory rules."""
+        if name.startswith('.') or name.startswith('__'):
+            return True
+        return any(fnmatch(name, pattern) for pattern in self.EXCLUDED_DIRECTORIES)
+
+    def _walk_files(self, skipped_files: Dict[str, List[str]]) -> Iterator[Path]:
+        """Walk the repository once with os.scandir, pruning excluded directories."""
+        self._walk_stats = {'dirs_scanned': 0, 'dirs_pending': 1, 'files_found': 0}
+        stack = [str(self.repo_path)]
+
+        while stack:
+            current = stack.pop()
+            self._walk_stats['dirs_pending'] = len(stack)
+            try:
+                with os.scandir(current) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError as e:
+                logger.warning(f"Cannot read directory {current}: {e}")
+                continue
+            self._walk_stats['dirs_scanned'] += 1
+
+            subdirs = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        rel_dir = Path(entry.path).relative_to(self.repo_path)
+                        if self._is_excluded_directory(entry.name):
+                            skipped_files["Directory excluded"].append(f"{rel_dir}/")
+                        elif self.gitignore.is_ignored(rel_dir.as_posix(), is_dir=True):
+                            skipped_files["Gitignore pattern match"].append(f"{rel_dir}/")
+                        else:
+                            subdirs.append(entry.path)
+                    elif entry.is_file():
+                        self._walk_stats['files_found'] += 1
+                        yield Path(entry.path)
+                except OSError as e:
+                    logger.warning(f"Cannot access {entry.path}: {e}")
+
+            # Push in reverse so directories are visited in sorted order
+            stack.extend(reversed(subdirs))
+            self._walk_stats['dirs_pending'] = len(stack)
+
+    def _estimate_total_files(self, processed: int) -> int:
+        """Estimate the total file count from the directories scanned so far."""
+        stats = self._walk_stats
+        if not stats['dirs_scanned']:
+            return processed
+        files_per_dir = stats['files_found'] / stats['dirs_scanned']
+        return max(processed, int(stats['files_found'] + stats['dirs_pending'] * files_per_dir))
+
+    def _iter_included_files(self, skipped_files: Dict[str, List[str]]) -> Iterator[Path]:
+        """Yield files that pass the filters, recording the ones that are skipped."""
+        processed = 0
+
+        # Single pass: excluded directories are pruned before we descend into them
+        for file_path in self._walk_files(skipped_files):
+            logger.info(f"Checking file: {file_path}")
+            processed += 1
+
+            if processed % 100 == 0:
+                logger.info(f"Processed {processed}/~{self._estimate_total_files(processed)} files...")
+
+            # Check if the file should be processed
+            if not self._should_process_file(file_path):
+                reason = "Extension excluded" if file_path.suffix in self.EXCLUDED_EXTENSIONS else \
+                        "Directory excluded" if any(excluded in file_path.parts for excluded in self.EXCLUDED_DIRECTORIES) else \
+                        "Gitignore pattern match"
+                skipped_files[reason].append(str(file_path.relative_to(self.repo_path)))
+                continue
+
+            yield file_path
+
+        logger.info(f"Found {processed} files in {self._walk_stats['dirs_scanned']} directories.")
+
+    def _lookup_cached(self, file_path: Path) -> Tuple[Optional[os.stat_result], Optional[Dict[str, Any]]]:
+        """Return the file's stat and its cached record, if the file is unchanged."""
+        if self.cache is None:
+            return None, None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None, None
+        return stat, self.cache.get(file_path.relative_to(self.repo_path).as_posix(), stat)
+
+    def _store_cached(self, file_path: Path, stat: Optional[os.stat_result], file_info: Dict[str, Any]) -> None:
+        """Save a fresh analysis result to the cache."""
+        if self.cache is not None and stat is not None:
+            self.cache.put(file_path.relative_to(self.repo_path).as_posix(), stat, file_info)
+
+    def _merge_batch(self, batch: List[Tuple[Path, Optional[os.stat_result], Optional[Dict[str, Any]]]],
+                     results: List[Dict[str, Any]]) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+        """Fill cache misses in a batch from worker results, keeping walk order."""
+        fresh = iter(results)
+        for file_path, stat, file_info in batch:
+            if file_info is None:
+                file_info = next(fresh)
+                self._store_cached(file_path, stat, file_info)
+            yield file_path, file_info
+
+    def _analyze_files(self, file_paths: Iterator[Path]) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+        """Analyze files inline or across a process pool, yielding results in walk order."""
+        if self.workers <= 1:
+            for file_path in file_paths:
+                stat, file_info = self._lookup_cached(file_path)
+                if file_info is None:
+                    file_info = self.analyze_file(file_path)
+                    self._store_cached(file_path, stat, file_info)
+                yield file_path, file_info
+            return
+
+        def submit(batch):
+            # Only cache misses are sent to the workers
+            misses = [file_path for file_path, _, file_info in batch if file_info is None]
+            return executor.submit(_analyze_batch, misses) if misses else None
+
+        # Keep a bounded window of batches in flight so memory stays flat on huge repos
+        max_in_flight = self.workers * 2
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_init_worker,
+                                 initargs=(str(self.repo_path),)) as executor:
+            batch = []
+            for file_path in file_paths:
+                batch.append((file_path, *self._lookup_cached(file_path)))
+                if len(batch) >= self.BATCH_SIZE:
+                    pending.append((batch, submit(batch)))
+                    batch = []
+                    while len(pending) >= max_in_flight:
+                        done_batch, future = pending.popleft()
+                        yield from self._merge_batch(done_batch, future.result() if future else [])
+            if batch:
+                pending.append((batch, submit(batch)))
+            while pending:
+                done_batch, future = pending.popleft()
+                yield from self._merge_batch(done_batch, future.result() if future else [])
+
     def process_repository(self) -> None:
         """Process the entire repository with filtering."""
         try:
             self.output_path.mkdir(exist_ok=True)
-            
-            # Count total files first
-            total_files = sum(1 for _ in self.repo_path.rglob('*') if _.is_file())
-            processed = 0
+
             skipped_files = defaultdict(list)
-            
-            logger.info(f"Found {total_files} files to process...")
-            
-            for file_path in self.repo_path.rglob('*'):
-                if file_path.is_file():
-                    logger.info(f"Checking file: {file_path}")
-                    processed += 1
-                    
-                    if processed % 100 == 0:
-                        logger.info(f"Processed {processed}/{total_files} files...")
-                    
-                    # Check if the file should be processed
-                    if not self._should_process_file(file_path):
-                        reason = "Extension excluded" if file_path.suffix in self.EXCLUDED_EXTENSIONS else \
-                                "Directory excluded" if any(excluded in file_path.parts for excluded in self.EXCLUDED_DIRECTORIES) else \
-                                "Gitignore pattern match"
-                        skipped_files[reason].append(str(file_path.relative_to(self.repo_path)))
-                        continue
-                    
+            included_files = self._iter_included_files(skipped_files)
+
+            # Unchanged files are served from the cache instead of being re-analyzed
+            if self.use_cache:
+                self.cache = AnalysisCache(self.output_path / self.CACHE_FILENAME, self.repo_path)
+
+            # NDJSON records are written as they are analyzed, so content is never held in memory
+            if self.export_format == 'ndjson':
+                self.exporter = NDJSONExporter(self._timestamped_output('analysis'), self.compression)
+
+            walk_complete = False
+            try:
+                # Results arrive in walk order, so file_structure is identical for any worker count
+                for file_path, file_info in self._analyze_files(included_files):
+                    if self.exporter is not None:
+                        self.exporter.write_file(file_info)
+                        file_info = {k: v for k, v in file_info.items() if k not in ('content', 'imports')}
+
                     # Get relative path to use in file_structure
                     relative_path = file_path.relative_to(self.repo_path)
-                    
-                    # Process the file if it should be included
-                    self.file_structure[str(relative_path.parent)][relative_path.name] = self.analyze_file(file_path)
+                    self.file_structure[str(relative_path.parent)][relative_path.name] = file_info
+                walk_complete = True
+            except Exception:
+                if self.exporter is not None:
+                    self.exporter.close()
+                raise
+            finally:
+                if self.cache is not None:
+                    # An interrupted walk hasn't seen every file, so keep the entries it didn't reach
+                    self.cache.close(prune=walk_complete)
 
             # Update metadata
             self.metadata = {
@@ -231,7 +523,8 @@ class RepoAnalyzer:
                 'skipped_files': dict(skipped_files),
                 'processing_summary': {
                     'processed_files': self.metadata.get('total_files', 0),
-                    'skipped_files': sum(len(files) for files in skipped_files.values())
+                    'skipped_files': sum(len(files) for files in skipped_files.values()),
+                    'cached_files': self.cache.hits if self.cache is not None else 0
                 }
             }
             
@@ -256,16 +549,27 @@ class RepoAnalyzer:
                     extensions[file_info['extension']] += 1
         return dict(extensions)
 
+    def _timestamped_output(self, prefix: str) -> Path:
+        """Return an output path (without extension) stamped with the current time."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return self.output_path / f'{prefix}_{timestamp}'
+
     def export_analysis(self) -> None:
         """Export the analysis results with a timestamped filename."""
         try:
+            if self.exporter is not None:
+                # File records were streamed during processing; finish with the metadata footer
+                self.exporter.write_metadata(self.metadata)
+                self.exporter.close()
+                logger.info(f"Analysis exported to {self.exporter.output_file}")
+                return
+
             output = {
                 'metadata': self.metadata,
                 'file_structure': dict(self.file_structure)
             }
             
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = self.output_path / f'analysis_{timestamp}.json'
+            output_file = self._timestamped_output('analysis').with_suffix('.json')
             with open(output_file, 'w', encoding='utf-8') as f:
                 json.dump(output, f, indent=2)
             
@@ -275,13 +579,50 @@ class RepoAnalyzer:
             logger.error(f"Error exporting analysis: {e}")
             raise
 
+# Per-process analyzer used by the worker pool
+_worker_analyzer = None
+
+def _init_worker(repo_path: str) -> None:
+    """Create one analyzer per worker process."""
+    global _worker_analyzer
+    logging.getLogger().setLevel(logging.WARNING)  # Keep worker output quiet
+    _worker_analyzer = RepoAnalyzer(repo_path, use_cache=False)
+
+def _analyze_batch(file_paths: List[Path]) -> List[Dict[str, Any]]:
+    """Analyze a batch of files inside a worker process."""
+    return [_worker_analyzer.analyze_file(file_path) for file_path in file_paths]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Analyze a repository and export a JSON snapshot.")
+    parser.add_argument('repo_path', nargs='?', help="Local repository path (prompted if omitted)")
+    parser.add_argument('--url', default=None, help="Repository URL to clone into repo_path")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of worker processes for file analysis (default: 1)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Re-analyze every file instead of reusing the incremental cache")
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json',
+                        help="Output format: one JSON document, or one line per file streamed as analyzed")
+    parser.add_argument('--compress', choices=['gzip', 'zstd'], default=None,
+                        help="Compress the NDJSON output (zstd needs the 'zstandard' package)")
+    return parser.parse_args()
+
 def main():
     try:
-        # Example usage
-        repo_url = input("Enter repository URL (or press Enter for local path): ").strip()
-        repo_path = input("Enter local repository path: ").strip()
+        args = parse_args()
+
+        if args.repo_path:
+            repo_url = args.url or ''
+            repo_path = args.repo_path
+        else:
+            # Example usage
+            repo_url = input("Enter repository URL (or press Enter for local path): ").strip()
+            repo_path = input("Enter local repository path: ").strip()
         
-        analyzer = RepoAnalyzer(repo_path)  # No output_path parameter needed
+        if args.compress and args.format != 'ndjson':
+            raise ValueError("--compress is only supported with --format ndjson")
+
+        analyzer = RepoAnalyzer(repo_path, workers=args.workers, use_cache=not args.no_cache,
+                                export_format=args.format, compression=args.compress)  # No output_path parameter needed
         
         if repo_url:
             analyzer.clone_repo(repo_url)
@@ -0,0 +1,222 @@
+import os
+import re
+import sys
+import tempfile
+import subprocess
+
+# Shared by File-and-Folder-Structure and Repo-Analyzer. Each tool keeps its own
+# copy so it can run on its own; keep the two files identical.
+
+
+def translate_pattern(line):
+    """
+    Translate one .gitignore line into a regex.
+
+    Returns (regex, negate) or None for blank lines and comments. The regex is
+    matched against a path relative to the .gitignore's folder, with a trailing
+    '/' added for directories.
+    """
+    line = line.rstrip('\r\n')
+    # Trailing spaces are ignored unless escaped with a backslash
+    while line.endswith(' ') and not line.endswith('\\ '):
+        line = line[:-1]
+    if not line or line.startswith('#'):
+        return None
+
+    negate = False
+    if line.startswith('!'):
+        negate = True
+        line = line[1:]
+    elif line.startswith(('\\!', '\\#')):
+        line = line[1:]
+
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+
+    # A slash at the start or in the middle anchors the pattern to the .gitignore's folder
+    anchored = '/' in line
+    line = line.lstrip('/')
+
+    regex = []
+    i = 0
+    n = len(line)
+    while i < n:
+        if i == 0 and line.startswith('**/'):
+            regex.append('(?:.*/)?')  # Leading **/ matches in all directories
+            i += 3
+        elif line.startswith('/**/', i):
+            regex.append('/(?:.*/)?')  # /**/ matches zero or more directories
+            i += 4
+        elif line.startswith('/**', i) and i + 3 == n:
+            regex.append('/.+')  # Trailing /** matches everything inside
+            i += 3
+        elif line[i] == '*':
+            start = i
+            while i < n and line[i] == '*':
+                i += 1
+            # A '*' that is a whole path segment must match at least one character,
+            # so 'foo/*' matches what is inside foo but not the folder 'foo/' itself
+            whole_segment = (start == 0 or line[start - 1] == '/') and (i == n or line[i] == '/')
+            regex.append('[^/]+' if whole_segment else '[^/]*')
+        elif line[i] == '?':
+            regex.append('[^/]')
+            i += 1
+        elif line[i] == '[':
+            end = line.find(']', i + 2 if line.startswith(('[!', '[^'), i) else i + 1)
+            if end == -1:
+                regex.append(re.escape('['))
+                i += 1
+                continue
+            body = line[i + 1:end]
+            if body[:1] in ('!', '^'):
+                body = '^' + body[1:]
+            regex.append('[' + body.replace('\\', '\\\\') + ']')
+            i = end + 1
+        elif line[i] == '\\' and i + 1 < n:
+            regex.append(re.escape(line[i + 1]))
+            i += 2
+        else:
+            regex.append(re.escape(line[i]))
+            i += 1
+
+    prefix = '' if anchored else '(?:.*/)?'
+    suffix = '/' if dir_only else '/?'
+    return prefix + ''.join(regex) + suffix, negate
+
+
+class GitignoreSpec:
+    """All patterns of one .gitignore file compiled into a single regex."""
+
+    def __init__(self, lines):
+        rules = [rule for rule in (translate_pattern(line) for line in lines) if rule]
+        # Later patterns win, so they go first in the alternation. Each rule is one
+        # capturing group and the matching group's index tells us which rule hit.
+        rules.reverse()
+        self.negations = [negate for _, negate in rules]
+        self.regex = re.compile('|'.join(f'({regex})' for regex, _ in rules)) if rules else None
+
+    @classmethod
+    def from_file(cls, gitignore_path):
+        """Load a spec from a .gitignore file, or return None if it can't be read."""
+        try:
+            with open(gitignore_path, 'r', encoding='utf-8') as file:
+                return cls(file)
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def match(self, rel_path):
+        """Return True (ignored), False (re-included by '!') or None (no pattern matched)."""
+        if self.regex is None:
+            return None
+        m = self.regex.fullmatch(rel_path)
+        if m is None:
+            return None
+        return not self.negations[m.lastindex - 1]
+
+
+class GitignoreMatcher:
+    """
+    Gitignore rules for a whole folder tree.
+
+    Nested .gitignore files are loaded on first use. Deeper files take
+    precedence over shallower ones, and within a file the last matching
+    pattern wins. Like git, nothing inside an ignored folder can be re-included.
+    """
+
+    def __init__(self, root_folder, root_gitignore=None):
+        self.root_folder = root_folder
+        self._specs = {}
+        self._ignored_dirs = {}
+        if root_gitignore:
+            self._specs[''] = GitignoreSpec.from_file(root_gitignore)
+
+    def _spec_for(self, rel_dir):
+        if rel_dir not in self._specs:
+            gitignore_path = os.path.join(self.root_folder, rel_dir, '.gitignore')
+            self._specs[rel_dir] = GitignoreSpec.from_file(gitignore_path) if os.path.isfile(gitignore_path) else None
+        return self._specs[rel_dir]
+
+    def _match(self, rel_path, is_dir):
+        parts = rel_path.split('/')
+        target = rel_path + '/' if is_dir else rel_path
+        # Check the deepest .gitignore first; the first one with an opinion decides
+        for depth in range(len(parts) - 1, -1, -1):
+            base = '/'.join(parts[:depth])
+            spec = self._spec_for(base)
+            if spec is None:
+                continue
+            verdict = spec.match(target[len(base) + 1:] if base else target)
+            if verdict is not None:
+                return verdict
+        return False
+
+    def _is_dir_ignored(self, rel_dir):
+        if rel_dir not in self._ignored_dirs:
+            parent = rel_dir.rpartition('/')[0]
+            self._ignored_dirs[rel_dir] = (
+                (bool(parent) and self._is_dir_ignored(parent)) or self._match(rel_dir, True)
+            )
+        return self._ignored_dirs[rel_dir]
+
+    def is_ignored(self, rel_path, is_dir=False):
+        """Check a path relative to the root folder ('/' or os.sep separated)."""
+        rel_path = rel_path.replace(os.sep, '/').strip('/')
+        if not rel_path or rel_path == '.':
+            return False
+        if is_dir:
+            return self._is_dir_ignored(rel_path)
+        parent = rel_path.rpartition('/')[0]
+        if parent and self._is_dir_ignored(parent):
+            return True
+        return self._match(rel_path, False)
+
+
+# Patterns and paths (folders end in '/') compared with `git check-ignore` by the self-check below
+SELF_CHECK_GITIGNORE = [
+    '/build/*', '!/build/.gitkeep',
+    'dir/*', '!dir/keep',
+    'logs/', '*.log', '!important.log',
+    'docs/**/draft*', 'a?c', '[bc]at',
+]
+SELF_CHECK_PATHS = [
+    'build/', 'build/.gitkeep', 'build/out.o', 'build/sub/', 'build/sub/x',
+    'dir/', 'dir/keep', 'dir/other', 'dir/sub/', 'dir/sub/keep',
+    'logs/', 'logs/today.txt', 'error.log', 'important.log', 'src/debug.log',
+    'docs/draft1', 'docs/a/b/draft2', 'docs/final', 'abc', 'ac', 'cat', 'rat',
+]
+
+
+def check_against_git(gitignore_lines=SELF_CHECK_GITIGNORE, paths=SELF_CHECK_PATHS):
+    """
+    Build a scratch repo with the given .gitignore and paths, and return the
+    paths where GitignoreMatcher disagrees with `git check-ignore`.
+    """
+    with tempfile.TemporaryDirectory() as root:
+        subprocess.run(['git', 'init', '-q', root], check=True)
+        with open(os.path.join(root, '.gitignore'), 'w', encoding='utf-8') as file:
+            file.write('\n'.join(gitignore_lines) + '\n')
+        for path in paths:
+            full_path = os.path.join(root, *path.rstrip('/').split('/'))
+            if path.endswith('/'):
+                os.makedirs(full_path, exist_ok=True)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                open(full_path, 'w').close()
+
+        completed = subprocess.run(['git', 'check-ignore', '--stdin'], cwd=root, capture_output=True, text=True,
+                                   input='\n'.join(path.rstrip('/') for path in paths) + '\n')
+        git_ignored = set(completed.stdout.splitlines())
+        matcher = GitignoreMatcher(root, os.path.join(root, '.gitignore'))
+        return [path for path in paths
+                if matcher.is_ignored(path, is_dir=path.endswith('/')) != (path.rstrip('/') in git_ignored)]
+
+
+if __name__ == "__main__":
+    # Self-check: python gitignore_matcher.py
+    mismatches = check_against_git()
+    for path in mismatches:
+        print(f"Differs from git check-ignore: {path}")
+    print("OK" if not mismatches else f"{len(mismatches)} mismatch(es)")
+    sys.exit(1 if mismatches else 0)